@@ -1,130 +1,202 @@
 import streamlit as st
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import io
-
-# --- PDF 출력을 위한 한글 폰트 등록 ---
-# Streamlit Cloud 환경에서 PDF에 한글을 올바르게 표시하려면,
-# 'NanumGothic.ttf'와 같은 한글 폰트 파일이 app.py와 동일한 디렉토리에 있어야 합니다.
-# 폰트 파일이 없으면 PDF에서 한글이 깨지거나 표시되지 않을 수 있습니다.
-try:
-    # 폰트 파일이 현재 스크립트와 같은 디렉토리에 있는지 확인합니다.
-    pdfmetrics.registerFont(TTFont('NanumGothic', 'NanumGothic.ttf'))
-    KOREAN_FONT_REGISTERED = True
-except Exception as e:
-    # 폰트 로드 실패 시 사용자에게 경고 메시지를 표시합니다.
-    st.warning(f"PDF 출력 시 한글 폰트 로드 오류: {e}. 'NanumGothic.ttf' 파일이 같은 폴더에 없거나 손상되었을 수 있습니다. PDF에서 한글이 올바르게 표시되지 않을 수 있습니다.")
-    KOREAN_FONT_REGISTERED = False
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from draft_store import DraftStore, new_draft_id
+from letter_draft import LetterDraft, STEP_TITLES, WRITER_OPTIONS, RECIPIENT_OPTIONS, EMOTIONS, EMOTION_LABELS, CHECK_LABELS, CHECK_QUESTIONS
+from metrics import registry as metrics, start_exporters_from_env
+from pdf_cache import PdfCache, PDF_CACHE_MAX_BYTES, make_pdf_cache_key
+from render_pool import RenderPool, RenderQueueFull
+from concurrent.futures import Future
+import functools
+import os
+import secrets
+
+# --- 성능 계측 ---
+# LETTER_METRICS_SAMPLE_RATE 환경 변수로 켜며, 꺼져 있으면 계측 코드는 거의 아무 일도 하지 않습니다. (metrics.py)
+@st.cache_resource
+def start_metrics_exporters():
+    # 계측 값을 내보내는 HTTP 서버/파일 기록 스레드는 프로세스당 하나만 띄웁니다.
+    return start_exporters_from_env()
+
+start_metrics_exporters()
+if 'metrics_session_id' not in st.session_state:
+    st.session_state.metrics_session_id = secrets.token_hex(8) # 세션별 재실행 횟수를 세기 위한 ID
+
+def count_rerun():
+    """이 세션의 스크립트(또는 fragment) 실행 한 번을 셉니다."""
+    metrics.record_rerun(st.session_state.metrics_session_id)
+
+def count_fragment_rerun():
+    """fragment 본문 맨 앞에서 부릅니다. fragment 본문은 앱 전체를 실행할 때도 함께 실행되므로(그때는 맨 위에서 이미 셈),
+    그 fragment만 다시 실행될 때만 셉니다."""
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        count_rerun()
+
+count_rerun()
 
 # --- 세션 상태 초기화 ---
-# 앱의 여러 화면 간에 사용자 입력을 유지하기 위해 세션 상태 변수를 초기화합니다.
-if 'current_step' not in st.session_state:
-    st.session_state.current_step = 1 # 현재 앱 화면 단계를 나타냅니다.
-if 'writer_character' not in st.session_state:
-    st.session_state.writer_character = "" # 편지를 쓰는 '나'를 저장합니다.
-if 'selected_character' not in st.session_state:
-    st.session_state.selected_character = "" # 편지를 받을 등장인물 이름을 저장합니다.
-if 'event_description' not in st.session_state:
-    st.session_state.event_description = "" # 등장인물이 겪은 사건 설명을 저장합니다.
-if 'selected_emojis' not in st.session_state:
-    st.session_state.selected_emojis = [] # 선택된 감정 이모지 목록을 저장합니다.
-if 'shared_feelings' not in st.session_state:
-    st.session_state.shared_feelings = "" # 등장인물에게 나누고 싶은 마음을 저장합니다.
-if 'letter_intro' not in st.session_state:
-    st.session_state.letter_intro = "" # 편지 - 첫인사
-if 'letter_event_detail' not in st.session_state:
-    st.session_state.letter_event_detail = "" # 편지 - 일어난 사건
-if 'letter_my_thoughts_actions' not in st.session_state:
-    st.session_state.letter_my_thoughts_actions = "" # 편지 - 일어난 사건에 대한 자신의 생각이나 행동
-if 'letter_shared_feelings_detail' not in st.session_state:
-    st.session_state.letter_shared_feelings_detail = "" # 편지 - 나누려는 마음
-if 'letter_closing' not in st.session_state:
-    st.session_state.letter_closing = "" # 편지 - 끝인사
-if 'letter_writer_name' not in st.session_state:
-    st.session_state.letter_writer_name = "" # 편지를 쓴 사람
-if 'check_event_detail' not in st.session_state:
-    st.session_state.check_event_detail = None # 점검 1: 일어난 사건 자세히 밝혔나요?
-if 'check_express_feelings' not in st.session_state:
-    st.session_state.check_express_feelings = None # 점검 2: 나누려는 마음 잘 표현했나요?
-if 'check_easy_expression' not in st.session_state:
-    st.session_state.check_easy_expression = None # 점검 3: 읽을 사람을 생각해 알기 쉬운 표현을 썼나요?
+# 작성 중인 편지는 LetterDraft 객체 하나(st.session_state.letter_draft)에 모두 담깁니다. (letter_draft.py)
+# 위젯은 이 객체의 필드를 직접 읽고 고치므로, 같은 값을 별도의 세션 상태 키에 한 번 더 보관하지 않습니다.
+
+# --- 임시 저장(초안) ---
+# 새로고침하거나 서버가 다시 시작되어도 이어 쓸 수 있도록 편지 내용을 초안 저장소(draft_store.py)에 저장합니다.
+# 초안 ID는 주소창의 ?draft= 값으로 유지되며, 같은 주소로 다시 열면 한 번의 조회로 세션을 복원합니다.
+@st.cache_resource
+def get_draft_store():
+    # 모든 세션이 하나의 저장소(와 백그라운드 기록 스레드)를 공유합니다.
+    return DraftStore()
+
+if 'letter_draft' not in st.session_state:
+    draft_id = st.query_params.get('draft')
+    saved_fields = get_draft_store().load(draft_id) if draft_id else None
+    if saved_fields is None:
+        # 저장된 초안이 없으면 새 초안 ID를 만들어 주소에 남깁니다.
+        draft_id = new_draft_id()
+        st.query_params['draft'] = draft_id
+        saved_fields = {}
+    st.session_state.letter_draft = LetterDraft.from_fields(saved_fields)
+    st.session_state.draft_id = draft_id
+    # 마지막으로 저장소에 넘긴 초안의 복사본. 이 값과 달라진 필드만 다시 저장합니다.
+    st.session_state.draft_saved = st.session_state.letter_draft.copy()
+
+draft = st.session_state.letter_draft
+
+def autosave_draft():
+    """지난번 저장 이후 바뀐 필드만 초안 저장소의 기록 대기열에 넣습니다. 실제 기록은 저장소가 모아서 합니다."""
+    changed = draft.changed_fields(st.session_state.draft_saved)
+    if changed:
+        get_draft_store().stage(st.session_state.draft_id, changed)
+        st.session_state.draft_saved = draft.copy()
 
 
 # --- 화면 이동 헬퍼 함수 ---
-# '다음 화면' 또는 '이전 화면' 버튼 클릭 시 세션 상태를 업데이트하여 화면을 전환합니다.
+# '다음 화면' 또는 '이전 화면' 버튼 클릭 시 초안의 현재 단계를 바꾸어 화면을 전환합니다.
 def next_step():
-    st.session_state.current_step += 1
+    draft.current_step += 1
 
 def prev_step():
-    st.session_state.current_step -= 1
+    draft.current_step -= 1
 
 # 특정 단계로 바로 이동하는 함수
 def go_to_step(step_number):
-    st.session_state.current_step = step_number
-
-# --- PDF 생성 함수 ---
-# reportlab 라이브러리를 사용하여 작성된 편지 내용을 PDF 파일로 생성합니다.
-def generate_pdf(recipient_character, event_desc, selected_emojis, shared_feelings_summary,
-                 intro, event_detail, my_thoughts, shared_feelings_detail, closing, writer_name):
-    buffer = io.BytesIO() # PDF 데이터를 저장할 메모리 버퍼를 생성합니다.
-    doc = SimpleDocTemplate(buffer, pagesize=letter) # PDF 문서 객체를 생성합니다.
-    styles = getSampleStyleSheet() # 기본 스타일 시트를 가져옵니다.
-
-    # 한글 폰트가 등록되었는지 확인하고, 적절한 폰트 스타일을 적용합니다.
-    korean_style = styles['Normal']
-    if KOREAN_FONT_REGISTERED:
-        korean_style.fontName = 'NanumGothic' # 등록된 나눔고딕 폰트 사용
+    draft.current_step = step_number
+
+# 5단계 편지 입력 칸의 on_change 콜백
+# 입력 칸 값을 초안에 반영한 뒤, 편지 입력 영역 대신 점검/출력 fragment만 다시 실행합니다.
+def sync_letter_field(field, widget_key):
+    setattr(draft, field, st.session_state[widget_key])
+    st.rerun("letter_export")
+
+# --- PDF 출력을 위한 한글 폰트 등록 ---
+# reportlab(letter_pdf.py)은 불러오는 데만 0.1초 넘게 걸리고 화면 1~4에서는 쓰지 않으므로,
+# 스크립트 맨 위가 아니라 PDF가 처음 필요할 때(5단계 PDF 출력) 불러옵니다.
+# 모듈은 프로세스당 한 번만 불러오므로 폰트도 프로세스당 한 번만 분석·등록됩니다.
+def load_pdf_stack():
+    """PDF 생성 모듈을 불러오고 한글 폰트를 등록한 뒤, 폰트 진단 정보(dict)를 돌려줍니다."""
+    from letter_pdf import load_korean_font
+    font_diagnostic = load_korean_font()
+    if not font_diagnostic["registered"] and not st.session_state.get('font_warning_shown'):
+        # 폰트 로드 실패 시 사용자에게 경고 메시지를 표시합니다. (세션마다 한 번만 표시)
+        st.session_state.font_warning_shown = True
+        st.warning(f"PDF 출력 시 한글 폰트 로드 오류: {font_diagnostic['error']}. 'NanumGothic.ttf' 파일이 같은 폴더에 없거나 손상되었을 수 있습니다. PDF에서 한글이 올바르게 표시되지 않을 수 있습니다.")
+    return font_diagnostic
+
+# --- PDF 캐시 ---
+# 같은 편지를 매번 새로 만들지 않도록 완성된 PDF를 모든 세션이 함께 쓰는 캐시에 보관합니다. (pdf_cache.py)
+@st.cache_resource
+def get_pdf_cache():
+    # st.cache_resource로 감싸 모든 세션이 같은 캐시 객체를 공유하도록 합니다.
+    return PdfCache(PDF_CACHE_MAX_BYTES)
+
+# --- 출력 방식 ---
+# PDF 파일(기본): 서버(작업 프로세스)에서 PDF 파일을 만듭니다.
+# 인쇄 화면: 인쇄용 HTML(letter_html.py)을 브라우저로 보내 브라우저에서 인쇄하거나 PDF로 저장합니다. 서버는 글자만 HTML로 옮기고,
+#   웹 폰트는 프로세스당 한 번 정적 파일(app/static/)로 내보내 화면의 HTML이 가리키게 하므로, 세션에는 작은 HTML만 남습니다.
+#   폰트를 넣은 HTML 파일은 학생이 '인쇄 화면 파일 받기'를 누를 때만 만듭니다.
+EXPORT_MODES = ("PDF 파일", "인쇄 화면")
+PRINT_VIEW_HEIGHT = 640 # 인쇄 화면 미리보기의 높이(px)
+
+def request_print_view():
+    """'인쇄 화면 열기' 버튼의 on_click 콜백. 지금 편지 내용으로 인쇄용 HTML을 한 번 만들어 둡니다."""
+    from letter_html import render_letter_html
+    letter_fields = draft.letter_fields()
+    st.session_state.print_view = (letter_fields, render_letter_html(letter_fields, embed_font=False))
+
+# --- PDF 만들기 (요청할 때만) ---
+# 입력할 때마다 PDF를 미리 만들어 두지 않고, 학생이 'PDF 만들기'를 눌렀을 때만 한 번 만듭니다.
+# PDF는 모든 세션이 함께 쓰는 작업 프로세스 풀(render_pool.py)에서 만들므로, 여러 학생이 한꺼번에 PDF를 만들어도
+# 서버 프로세스의 재실행(화면 이동, 입력)이 느려지지 않습니다. 한 학생은 대기열에 요청을 하나만 둘 수 있고,
+# 대기열이 가득 차면 잠시 후 다시 누르도록 안내합니다.
+# 만든 PDF는 편지 내용이 바뀌면 버리고, 기다리는 도중에 내용이 바뀌면 대기열에서 뺍니다.
+PDF_RENDER_WORKERS = max(1, (os.cpu_count() or 1) - 1) # PDF를 만드는 작업 프로세스 수. 서버 프로세스를 위해 코어 하나를 남겨 둡니다.
+PDF_RENDER_QUEUE_SIZE = 30 # 작업 프로세스를 기다릴 수 있는 PDF 요청 수 (한 학급 정도)
+PDF_RENDER_POLL_INTERVAL = 0.3 # PDF를 만드는 동안 완성되었는지 확인하는 간격(초)
+
+@st.cache_resource
+def get_pdf_render_pool():
+    # 모든 세션이 같은 작업 프로세스들과 대기열을 함께 사용합니다. 작업 프로세스는 시작할 때 한글 폰트를 등록해 둡니다.
+    from letter_pdf import load_korean_font, render_letter_pdf
+    return RenderPool(render_letter_pdf, PDF_RENDER_WORKERS, PDF_RENDER_QUEUE_SIZE, initializer=load_korean_font)
+
+class PdfRenderJob:
+    """한 세션의 'PDF 만들기' 요청. 어떤 편지 내용으로 만드는지와 진행 중인 작업(future)을 함께 보관합니다."""
+
+    def __init__(self, letter_fields, future):
+        self.letter_fields = letter_fields
+        self.future = future
+
+    def cancel(self):
+        self.future.cancel() # 아직 대기열에 있으면 뺍니다. 작업 프로세스가 만드는 중이면 결과만 버려집니다.
+
+def start_pdf_render(letter_fields):
+    """PDF 만들기를 작업 프로세스 풀에 요청하고 PdfRenderJob을 돌려줍니다. 같은 편지가 캐시에 있으면 바로 끝납니다.
+
+    대기열이 가득 차 있으면 RenderQueueFull을 냅니다.
+    """
+    from letter_pdf import load_korean_font
+    cache_key = make_pdf_cache_key(letter_fields, load_korean_font()["registered"])
+    pdf_cache = get_pdf_cache()
+    pdf_bytes = pdf_cache.get(cache_key)
+    if pdf_bytes is not None:
+        future = Future()
+        future.set_result(pdf_bytes)
+        return PdfRenderJob(letter_fields, future)
+
+    def store_in_cache(future):
+        if not future.cancelled() and future.exception() is None:
+            pdf_cache.put(cache_key, future.result())
+
+    future = get_pdf_render_pool().submit(st.session_state.draft_id, letter_fields)
+    future.add_done_callback(store_in_cache)
+    return PdfRenderJob(letter_fields, future)
+
+def request_pdf():
+    """'PDF 만들기' 버튼의 on_click 콜백"""
+    try:
+        st.session_state.pdf_job = start_pdf_render(draft.letter_fields())
+    except RenderQueueFull:
+        st.session_state.pdf_job = None
+        st.session_state.pdf_queue_full = True # 버튼 아래에 "잠시 후 다시" 안내를 한 번 보여 줍니다.
+
+def discard_pdf_job():
+    """만들어 둔 PDF를 버립니다. 아직 만드는 중이면 작업을 취소합니다."""
+    pdf_job = st.session_state.get("pdf_job")
+    if pdf_job is not None:
+        pdf_job.cancel()
+        st.session_state.pdf_job = None
+
+def pdf_render_status():
+    # PDF를 만드는 동안에만 PDF_RENDER_POLL_INTERVAL마다 다시 실행되는 fragment 본문.
+    pdf_job = st.session_state.get("pdf_job")
+    if pdf_job is not None and not pdf_job.future.done():
+        waiting_ahead = get_pdf_render_pool().position(pdf_job.future)
+        if waiting_ahead is None:
+            st.caption("PDF를 만드는 중입니다...")
+        else:
+            st.caption(f"PDF를 만들 차례를 기다리는 중입니다... (앞에 {waiting_ahead}명)")
     else:
-        korean_style.fontName = 'Helvetica' # 폰트가 없을 경우 기본 폰트 (한글 깨짐 가능성 있음)
-    korean_style.fontSize = 12
-    korean_style.leading = 16 # 줄 간격 설정
-
-    elements = [] # PDF에 추가될 요소들의 리스트
-
-    # 편지 제목 (받는 사람)
-    elements.append(Paragraph(f"<b>{recipient_character}에게</b>", korean_style))
-    elements.append(Spacer(1, 0.3 * inch)) # 제목 아래 여백 추가
-
-    # 편지 내용 (각 파트별로 추가)
-    if intro:
-        elements.append(Paragraph(f"{intro}", korean_style))
-        elements.append(Spacer(1, 0.1 * inch))
-    if event_detail:
-        elements.append(Paragraph(f"{event_detail}", korean_style))
-        elements.append(Spacer(1, 0.1 * inch))
-    if my_thoughts:
-        elements.append(Paragraph(f"{my_thoughts}", korean_style))
-        elements.append(Spacer(1, 0.1 * inch))
-    if shared_feelings_detail:
-        elements.append(Paragraph(f"{shared_feelings_detail}", korean_style))
-        elements.append(Spacer(1, 0.1 * inch))
-    if closing:
-        elements.append(Paragraph(f"{closing}", korean_style))
-        elements.append(Spacer(1, 0.2 * inch))
-
-    # 글을 쓴 사람 (마지막에 추가)
-    if writer_name:
-        elements.append(Paragraph(f"<b>{writer_name}</b>", korean_style))
-        elements.append(Spacer(1, 0.5 * inch))
-
-
-    # --- 편지 작성 참고 정보 (PDF 하단에 추가) ---
-    elements.append(Paragraph("--- 편지 작성 참고 정보 ---", korean_style))
-    elements.append(Spacer(1, 0.15 * inch))
-    elements.append(Paragraph(f"<b>편지를 쓰는 사람:</b> {st.session_state.writer_character}", korean_style)) # 세션 상태에서 가져옴
-    elements.append(Paragraph(f"<b>편지를 받는 사람:</b> {recipient_character}", korean_style))
-    elements.append(Paragraph(f"<b>일어난 사건 요약:</b> {event_desc}", korean_style))
-    elements.append(Paragraph(f"<b>등장인물의 감정:</b> {' '.join(selected_emojis)}", korean_style))
-    elements.append(Paragraph(f"<b>나누고자 하는 마음 요약:</b> {shared_feelings_summary}", korean_style))
-
-
-    doc.build(elements) # 정의된 요소들로 PDF 문서를 빌드합니다.
-    buffer.seek(0) # 버퍼의 읽기/쓰기 위치를 처음으로 되돌립니다.
-    return buffer # PDF 데이터가 담긴 버퍼를 반환합니다.
+        # 다 만들었으면 한 번 다시 실행하여 다운로드 버튼을 보여 주고, 주기적인 확인을 멈춥니다.
+        st.rerun()
 
 # --- 메인 스트림릿 앱 레이아웃 ---
 # Streamlit 페이지의 기본 설정 (제목, 레이아웃)을 지정합니다.
@@ -135,40 +207,41 @@ st.title("「까만 달걀」 속 인물에게 내 마음을 전하는 글쓰기
 st.write("책 속 등장인물의 감정을 이해하고, 내 마음을 전하는 글을 써 보세요.")
 
 # 현재 화면 단계를 시각적으로 표시하는 내비게이션 바 (버튼으로 변경)
-nav_titles = {
-    1: "편지를 쓰는 '나'는 누구인가요?",
-    2: "마음을 전하고 싶은 등장인물을 선택해요",
-    3: "일어난 사건을 떠올려요",
-    4: "나누려는 마음을 생각해요",
-    5: "나누려는 마음을 담아 글을 써보세요"
-}
-
 nav_cols = st.columns(5) # 각 화면에 해당하는 5개의 컬럼 생성
 
 for i, col in enumerate(nav_cols, 1):
     with col:
         # 현재 화면은 비활성화된 (클릭 불가능한) 버튼으로 표시하여 현재 위치를 강조
         st.button(
-            nav_titles[i],
+            STEP_TITLES[i],
             on_click=go_to_step,
             args=(i,),
-            disabled=(i == st.session_state.current_step),
+            disabled=(i == draft.current_step),
             key=f"nav_button_{i}" # 고유한 키 부여
         )
 
 st.markdown("---") # 내비게이션 바 아래 구분선
 
+# 화면별 실행 시간 (아래 if/elif 가운데 실제로 실행된 화면 하나)
+step_span = metrics.span(f"step{draft.current_step}")
+
 # --- 화면 1: 편지를 쓰는 '나'는 누구인가요? ---
-if st.session_state.current_step == 1:
+if draft.current_step == 1:
     st.header("1. 편지를 쓰는 '나'는 누구인가요?")
-    writer_options = ["나", "아랑이", "아랑이의 어머니", "재현", "재현이의 아버지", "성구", "달이", "운철이", "달이의 아버지"]
-    # 편지를 쓰는 주체 선택을 위한 selectbox 위젯
-    st.session_state.writer_character = st.selectbox(
-        "편지를 쓰는 주체를 선택하세요.",
-        writer_options,
-        index=writer_options.index(st.session_state.writer_character) if st.session_state.writer_character in writer_options else 0,
-        key="writer_select"
-    )
+    # 선택 상자를 바꾸면 이 부분만 다시 실행됩니다. (화면 이동 버튼은 fragment 밖에 두어 앱 전체를 다시 실행)
+    @st.fragment
+    def writer_select_fragment():
+        count_fragment_rerun()
+        # 편지를 쓰는 주체 선택을 위한 selectbox 위젯
+        draft.writer_character = st.selectbox(
+            "편지를 쓰는 주체를 선택하세요.",
+            WRITER_OPTIONS,
+            index=WRITER_OPTIONS.index(draft.writer_character) if draft.writer_character in WRITER_OPTIONS else 0,
+            key="writer_select"
+        )
+        autosave_draft()
+
+    writer_select_fragment()
     st.markdown("---")
     # '다음 화면'으로 이동하는 버튼 (오른쪽에 배치)
     col1, col2 = st.columns(2)
@@ -176,16 +249,22 @@ if st.session_state.current_step == 1:
         st.button("다음 화면", on_click=next_step, help="다음 단계인 '마음을 전하고 싶은 등장인물을 선택해요' 화면으로 이동합니다.")
 
 # --- 화면 2: 마음을 전하고 싶은 등장인물을 선택해요 ---
-elif st.session_state.current_step == 2:
+elif draft.current_step == 2:
     st.header("2. 마음을 전하고 싶은 등장인물을 선택해요")
-    characters = ["아랑", "아랑이의 어머니", "재현", "재현이의 아버지", "성구", "달이", "운철이"] # "달이의 아버지"는 받는 대상에서는 제외
-    # 편지를 받을 등장인물 선택을 위한 selectbox 위젯
-    st.session_state.selected_character = st.selectbox(
-        "편지를 받을 대상(등장인물)을 선택하세요.", # 제목 변경
-        characters,
-        index=characters.index(st.session_state.selected_character) if st.session_state.selected_character in characters else 0,
-        key="recipient_select"
-    )
+    # 선택 상자를 바꾸면 이 부분만 다시 실행됩니다.
+    @st.fragment
+    def recipient_select_fragment():
+        count_fragment_rerun()
+        # 편지를 받을 등장인물 선택을 위한 selectbox 위젯
+        draft.selected_character = st.selectbox(
+            "편지를 받을 대상(등장인물)을 선택하세요.", # 제목 변경
+            RECIPIENT_OPTIONS,
+            index=RECIPIENT_OPTIONS.index(draft.selected_character) if draft.selected_character in RECIPIENT_OPTIONS else 0,
+            key="recipient_select"
+        )
+        autosave_draft()
+
+    recipient_select_fragment()
     st.markdown("---")
     # '이전 화면'과 '다음 화면' 버튼
     col1, col2 = st.columns(2)
@@ -196,39 +275,34 @@ elif st.session_state.current_step == 2:
 
 
 # --- 화면 3: 일어난 사건을 떠올려요 ---
-elif st.session_state.current_step == 3:
+elif draft.current_step == 3:
     st.header("3. 일어난 사건을 떠올려요")
     st.write("등장인물이 겪은 상황이나 사건을 떠올려 적어주세요.")
-    # 사건/상황 내용을 입력하는 text_area 위젯
-    st.session_state.event_description = st.text_area(
-        "사건/상황 내용",
-        value=st.session_state.event_description, # 세션 상태 값으로 초기화
-        height=150, # 텍스트 영역의 높이 설정
-        key="event_text_area",
-        placeholder="예: 아랑이가 낱말 카드를 만들어 엄마에게 한국말을 알려줬을 때" # 입력 예시
-    )
-
-    st.write("그 상황에서 등장인물의 마음은 어땠을까요? 감정을 이모지로 표현하고 선택해 보세요. (여러 개 선택 가능)")
-    # 감정 이름과 해당 이모지 매핑 딕셔너리
-    emotions = {
-        "무섭다": "😨", "슬프다": "😢", "외롭다": "😔", "짜증나다": "😤", "화나다": "😡",
-        "신나다": "🤩", "행복하다": "😊", "당황하다": "😳", "미안하다": "🙏", "창피하다": "😳",
-        "억울하다": "😩", "즐겁다": "😄", "답답하다": "😐", "걱정되다": "😟", "설레다": "💖",
-        "샘나다": "😒", "실망하다": "😞", "울고싶다": "😭", "부끄럽다": "😳", "재미있다": "😂",
-        "편안하다": "😌", "기쁘다": "🥳", "얄밉다": "😠", "속상하다": "💔", "뿌듯하다": "👍",
-        "우울하다": "😔", "서운하다": "😔", "만족하다": "😌", "불안하다": "😬", "놀라다": "😲",
-        "쓸쓸하다": "🍂", "신경질나다": "😠", "아쉽다": "😟", "약오르다": "😤", "후회되다": "🤦‍♀️"
-    }
-    # 멀티셀렉트 박스에 표시될 옵션 (예: "무섭다 😨")
-    emoji_options_for_display = [f"{name} {emoji}" for name, emoji in emotions.items()]
-
-    # 감정 선택을 위한 multiselect 위젯
-    st.session_state.selected_emojis = st.multiselect(
-        "등장인물의 감정을 선택하세요.",
-        options=emoji_options_for_display,
-        default=st.session_state.selected_emojis, # 이전에 선택된 값들로 기본 설정
-        key="emotion_multiselect"
-    )
+    # 사건 입력과 감정 선택을 바꾸면 이 부분만 다시 실행됩니다.
+    @st.fragment
+    def event_fragment():
+        count_fragment_rerun()
+        # 사건/상황 내용을 입력하는 text_area 위젯
+        draft.event_description = st.text_area(
+            "사건/상황 내용",
+            value=draft.event_description, # 초안 값으로 초기화
+            height=150, # 텍스트 영역의 높이 설정
+            key="event_text_area",
+            placeholder="예: 아랑이가 낱말 카드를 만들어 엄마에게 한국말을 알려줬을 때" # 입력 예시
+        )
+
+        st.write("그 상황에서 등장인물의 마음은 어땠을까요? 감정을 이모지로 표현하고 선택해 보세요. (여러 개 선택 가능)")
+        # 감정 선택을 위한 multiselect 위젯. 선택지는 EMOTIONS의 번호이고, 화면에는 "무섭다 😨"처럼 표시합니다.
+        draft.emotion_indices = tuple(st.multiselect(
+            "등장인물의 감정을 선택하세요.",
+            options=range(len(EMOTIONS)),
+            format_func=EMOTION_LABELS.__getitem__,
+            default=draft.emotion_indices, # 이전에 선택된 값들로 기본 설정
+            key="emotion_multiselect"
+        ))
+        autosave_draft()
+
+    event_fragment()
 
     st.markdown("---")
     # '이전 화면'과 '다음 화면' 버튼 (각각 왼쪽, 오른쪽에 배치)
@@ -239,17 +313,24 @@ elif st.session_state.current_step == 3:
         st.button("다음 화면", on_click=next_step, help="다음 단계인 '나누려는 마음을 생각해요' 화면으로 이동합니다.")
 
 # --- 화면 4: 나누려는 마음을 생각해요 ---
-elif st.session_state.current_step == 4:
+elif draft.current_step == 4:
     st.header("4. 나누려는 마음을 생각해요")
     st.write("등장인물에게 어떤 마음을 나누고자 하는지, 어떤 마음을 전달하고 싶은지 작성해 보세요.")
-    # 나누고 싶은 마음을 입력하는 text_area 위젯
-    st.session_state.shared_feelings = st.text_area(
-        "나누고 싶은 마음",
-        value=st.session_state.shared_feelings, # 세션 상태 값으로 초기화
-        height=150,
-        key="shared_feelings_text_area",
-        placeholder="예: 아랑이가 엄마를 향한 자신의 마음을 깨닫고 한국말을 가르쳐준 행동에 잘했다고 칭찬을 해주고 싶어요."
-    )
+    # 입력 칸을 바꾸면 이 부분만 다시 실행됩니다.
+    @st.fragment
+    def shared_feelings_fragment():
+        count_fragment_rerun()
+        # 나누고 싶은 마음을 입력하는 text_area 위젯
+        draft.shared_feelings = st.text_area(
+            "나누고 싶은 마음",
+            value=draft.shared_feelings, # 초안 값으로 초기화
+            height=150,
+            key="shared_feelings_text_area",
+            placeholder="예: 아랑이가 엄마를 향한 자신의 마음을 깨닫고 한국말을 가르쳐준 행동에 잘했다고 칭찬을 해주고 싶어요."
+        )
+        autosave_draft()
+
+    shared_feelings_fragment()
 
     st.markdown("---")
     # '이전 화면'과 '다음 화면' 버튼
@@ -260,16 +341,16 @@ elif st.session_state.current_step == 4:
         st.button("다음 화면", on_click=next_step, help="다음 단계인 '나누려는 마음을 담아 글을 써 보세요.' 화면으로 이동합니다.")
 
 # --- 화면 5: 나누려는 마음을 담아 글을 써 보세요. ---
-elif st.session_state.current_step == 5:
+elif draft.current_step == 5:
     st.header("5. 나누려는 마음을 담아 글을 써 보세요.")
-    st.write(f"이제 {st.session_state.selected_character}에게 편지를 써 보세요. 왼쪽에 제시된 힌트를 참고하여 작성할 수 있습니다.")
+    st.write(f"이제 {draft.selected_character}에게 편지를 써 보세요. 왼쪽에 제시된 힌트를 참고하여 작성할 수 있습니다.")
 
     # 편지 내용 입력 영역과 힌트 영역을 컬럼으로 분리하여 나란히 표시
     col_hints, col_letter = st.columns([1, 4]) # 힌트 컬럼을 편지 컬럼보다 좁게 설정
 
     with col_hints:
         # 각 힌트와 입력 칸의 위치를 맞추기 위한 미세 조정 (trial and error 기반)
-        # `st.markdown(f"{st.session_state.selected_character}에게")`의 높이와 간격을 고려
+        # `st.markdown(f"{draft.selected_character}에게")`의 높이와 간격을 고려
         # text_area 높이를 80으로 늘려 힌트 정렬에 더 유연하게 대응
         st.markdown("<div style='height: 70px;'></div>", unsafe_allow_html=True) # "받는이에게" 줄과 "첫인사" 힌트 간격
         st.markdown("<b>첫인사</b>", unsafe_allow_html=True)
@@ -292,142 +373,206 @@ elif st.session_state.current_step == 5:
         st.markdown("<div style='height: 20x;'></div>", unsafe_allow_html=True) # `letter_closing` text_area 높이 (80px) 고려하여 중앙 정렬
 
     with col_letter:
-        st.markdown(f"{st.session_state.selected_character}에게") # 받는 사람 이름은 일반 텍스트로 표시
-
-        st.session_state.letter_intro = st.text_area(
-            "첫인사를 작성해 보세요.",
-            value=st.session_state.letter_intro,
-            height=80, # 높이 조정
-            key="letter_intro_area",
-            label_visibility="collapsed" # 레이블 숨김 (힌트가 대신 역할)
-        )
-        st.session_state.letter_event_detail = st.text_area(
-            "일어난 사건을 자세히 작성해 보세요.",
-            value=st.session_state.letter_event_detail,
-            height=80, # 높이 조정
-            key="letter_event_detail_area",
-            label_visibility="collapsed"
-        )
-        st.session_state.letter_my_thoughts_actions = st.text_area(
-            "일어난 사건에 대한 자신의 생각이나 행동을 작성해 보세요.",
-            value=st.session_state.letter_my_thoughts_actions,
-            height=80, # 높이 조정
-            key="letter_my_thoughts_actions_area",
-            label_visibility="collapsed"
-        )
-        st.session_state.letter_shared_feelings_detail = st.text_area(
-            "나누려는 마음을 작성해 보세요.",
-            value=st.session_state.letter_shared_feelings_detail,
-            height=80, # 높이 조정
-            key="letter_shared_feelings_detail_area",
-            label_visibility="collapsed"
-        )
-        st.session_state.letter_closing = st.text_area(
-            "끝인사를 작성해 보세요.",
-            value=st.session_state.letter_closing,
-            height=80, # 높이 조정
-            key="letter_closing_area",
-            label_visibility="collapsed"
-        )
-        st.session_state.letter_writer_name = st.text_input(
-            "글을 쓴 사람", # '글을 쓴 사람'은 힌트가 아닌 label로 표시
-            value=st.session_state.letter_writer_name,
-            key="letter_writer_name_input",
-            placeholder="예: OO이가,OOO 드림"
-        )
+        # 편지 입력 칸. 입력 칸을 고치면 on_change 콜백(sync_letter_field)이 값을 초안에 반영하고
+        # 이 값에 의존하는 점검/출력 fragment만 다시 실행합니다.
+        @st.fragment(key="letter_editor")
+        def letter_editor_fragment():
+            st.markdown(f"{draft.selected_character}에게") # 받는 사람 이름은 일반 텍스트로 표시
+
+            st.text_area(
+                "첫인사를 작성해 보세요.",
+                value=draft.letter_intro,
+                height=80, # 높이 조정
+                key="letter_intro_area",
+                on_change=sync_letter_field,
+                args=("letter_intro", "letter_intro_area"),
+                label_visibility="collapsed" # 레이블 숨김 (힌트가 대신 역할)
+            )
+            st.text_area(
+                "일어난 사건을 자세히 작성해 보세요.",
+                value=draft.letter_event_detail,
+                height=80, # 높이 조정
+                key="letter_event_detail_area",
+                on_change=sync_letter_field,
+                args=("letter_event_detail", "letter_event_detail_area"),
+                label_visibility="collapsed"
+            )
+            st.text_area(
+                "일어난 사건에 대한 자신의 생각이나 행동을 작성해 보세요.",
+                value=draft.letter_my_thoughts_actions,
+                height=80, # 높이 조정
+                key="letter_my_thoughts_actions_area",
+                on_change=sync_letter_field,
+                args=("letter_my_thoughts_actions", "letter_my_thoughts_actions_area"),
+                label_visibility="collapsed"
+            )
+            st.text_area(
+                "나누려는 마음을 작성해 보세요.",
+                value=draft.letter_shared_feelings_detail,
+                height=80, # 높이 조정
+                key="letter_shared_feelings_detail_area",
+                on_change=sync_letter_field,
+                args=("letter_shared_feelings_detail", "letter_shared_feelings_detail_area"),
+                label_visibility="collapsed"
+            )
+            st.text_area(
+                "끝인사를 작성해 보세요.",
+                value=draft.letter_closing,
+                height=80, # 높이 조정
+                key="letter_closing_area",
+                on_change=sync_letter_field,
+                args=("letter_closing", "letter_closing_area"),
+                label_visibility="collapsed"
+            )
+            st.text_input(
+                "글을 쓴 사람", # '글을 쓴 사람'은 힌트가 아닌 label로 표시
+                value=draft.letter_writer_name,
+                key="letter_writer_name_input",
+                on_change=sync_letter_field,
+                args=("letter_writer_name", "letter_writer_name_input"),
+                placeholder="예: OO이가,OOO 드림"
+            )
+
+        letter_editor_fragment()
 
 
     st.markdown("---")
     st.subheader("나누려는 마음 글쓰기를 점검해 봅시다")
 
-    # 점검 항목 1
-    st.session_state.check_event_detail = st.radio(
-        "1) 일어난 사건을 자세히 밝혔나요?",
-        options=["예", "아니오"],
-        # 첫 로드 시 기본값 설정 (None이면 '예'로 초기화)
-        index=["예", "아니오"].index(st.session_state.check_event_detail) if st.session_state.check_event_detail in ["예", "아니오"] else 0,
-        key="check_event_detail_radio",
-        horizontal=True
-    )
-    if st.session_state.check_event_detail == "아니오":
-        st.info("💡 일어난 사건을 다시 한번 떠올려 읽을 사람이 이해하기 쉽게 자세히 씁니다.")
-
-    # 점검 항목 2
-    st.session_state.check_express_feelings = st.radio(
-        "2) 나누려는 마음을 잘 표현했나요?",
-        options=["예", "아니오"],
-        index=["예", "아니오"].index(st.session_state.check_express_feelings) if st.session_state.check_express_feelings in ["예", "아니오"] else 0,
-        key="check_express_feelings_radio",
-        horizontal=True
-    )
-    if st.session_state.check_express_feelings == "아니오":
-        st.info("💡 나누려는 마음을 자세하게 나타냅니다.")
-
-    # 점검 항목 3
-    st.session_state.check_easy_expression = st.radio(
-        "3) 읽을 사람을 생각해 알기 쉬운 표현을 썼나요?",
-        options=["예", "아니오"],
-        index=["예", "아니오"].index(st.session_state.check_easy_expression) if st.session_state.check_easy_expression in ["예", "아니오"] else 0,
-        key="check_easy_expression_radio",
-        horizontal=True
-    )
-    if st.session_state.check_easy_expression == "아니오":
-        st.info("💡 읽을 사람을 위해 정확하고 쉬운 표현을 씁니다.")
-
-    all_checked_yes = (
-        st.session_state.check_event_detail == "예" and
-        st.session_state.check_express_feelings == "예" and
-        st.session_state.check_easy_expression == "예"
-    )
-
-    st.markdown("---")
-    col_save, col_print_btn = st.columns(2)
-
-    with col_save:
-        if st.button("저장"):
-            st.success("편지 내용이 앱 내에 임시 저장되었습니다. (앱을 새로고침하거나 닫으면 내용이 사라질 수 있습니다.)")
-
-    with col_print_btn:
-        # PDF 출력 버튼 활성화 조건을 설정합니다.
-        # 모든 점검 항목이 '예'이고, 필수 편지 내용 칸이 모두 채워져 있을 때 활성화됩니다.
-        if all_checked_yes and \
-           st.session_state.writer_character and \
-           st.session_state.selected_character and \
-           st.session_state.event_description and \
-           st.session_state.shared_feelings and \
-           st.session_state.letter_intro and \
-           st.session_state.letter_event_detail and \
-           st.session_state.letter_my_thoughts_actions and \
-           st.session_state.letter_shared_feelings_detail and \
-           st.session_state.letter_closing and \
-           st.session_state.letter_writer_name:
-
-            pdf_buffer = generate_pdf(
-                st.session_state.selected_character,
-                st.session_state.event_description,
-                st.session_state.selected_emojis,
-                st.session_state.shared_feelings,
-                st.session_state.letter_intro,
-                st.session_state.letter_event_detail,
-                st.session_state.letter_my_thoughts_actions,
-                st.session_state.letter_shared_feelings_detail,
-                st.session_state.letter_closing,
-                st.session_state.letter_writer_name
-            )
-            st.download_button(
-                label="PDF 출력",
-                data=pdf_buffer,
-                file_name=f"{st.session_state.selected_character}_편지.pdf",
-                mime="application/pdf",
-                help="작성된 편지를 PDF 파일로 다운로드합니다."
-            )
-        else:
-            # 모든 점검 항목이 '예'가 아니면 경고 메시지 표시
-            if not all_checked_yes:
-                st.warning("답변한 내용을 참고해 글을 고쳐 써 봅시다. 모든 점검 항목을 '예'로 선택해야 PDF를 출력할 수 있습니다.")
-            # 필수 편지 내용이 누락된 경우 안내 메시지 표시
+    # 점검 항목과 저장/PDF 출력 영역. 편지 내용이나 점검 답변이 바뀌면 이 부분만 다시 실행됩니다.
+    @st.fragment(key="letter_export")
+    def letter_export_fragment():
+        count_fragment_rerun()
+        export_span = metrics.span("step5_letter_export")
+        # 점검 항목 1
+        draft.check_event_detail = st.radio(
+            CHECK_QUESTIONS["check_event_detail"],
+            options=(True, False),
+            format_func=CHECK_LABELS.get,
+            # 첫 로드 시 기본값 설정 (아직 답하지 않았으면 '예'로 초기화)
+            index=1 if draft.check_event_detail is False else 0,
+            key="check_event_detail_radio",
+            horizontal=True
+        )
+        if not draft.check_event_detail:
+            st.info("💡 일어난 사건을 다시 한번 떠올려 읽을 사람이 이해하기 쉽게 자세히 씁니다.")
+
+        # 점검 항목 2
+        draft.check_express_feelings = st.radio(
+            CHECK_QUESTIONS["check_express_feelings"],
+            options=(True, False),
+            format_func=CHECK_LABELS.get,
+            index=1 if draft.check_express_feelings is False else 0,
+            key="check_express_feelings_radio",
+            horizontal=True
+        )
+        if not draft.check_express_feelings:
+            st.info("💡 나누려는 마음을 자세하게 나타냅니다.")
+
+        # 점검 항목 3
+        draft.check_easy_expression = st.radio(
+            CHECK_QUESTIONS["check_easy_expression"],
+            options=(True, False),
+            format_func=CHECK_LABELS.get,
+            index=1 if draft.check_easy_expression is False else 0,
+            key="check_easy_expression_radio",
+            horizontal=True
+        )
+        if not draft.check_easy_expression:
+            st.info("💡 읽을 사람을 위해 정확하고 쉬운 표현을 씁니다.")
+
+        all_checked_yes = draft.all_checked_yes()
+
+        st.markdown("---")
+        col_save, col_print_btn = st.columns(2)
+
+        with col_save:
+            if st.button("저장"):
+                # 기다리지 않고 바로 디스크에 기록합니다.
+                autosave_draft()
+                get_draft_store().flush()
+                st.success(f"편지 내용이 저장되었습니다. 지금 주소(초안 ID: {st.session_state.draft_id})로 다시 열면 이어서 쓸 수 있습니다.")
+
+        with col_print_btn:
+            # 출력(인쇄 화면 / PDF 파일) 버튼 활성화 조건을 설정합니다.
+            # 모든 점검 항목이 '예'이고, 필수 편지 내용 칸이 모두 채워져 있을 때 활성화됩니다.
+            if all_checked_yes and draft.is_complete():
+                export_mode = st.radio(
+                    "출력 방식", EXPORT_MODES, key="export_mode_radio", horizontal=True,
+                    help="인쇄 화면은 브라우저에서 바로 인쇄하거나 PDF로 저장합니다. PDF 파일은 서버에서 파일을 만들어 내려받습니다."
+                )
+                if export_mode == "인쇄 화면":
+                    discard_pdf_job()
+                    print_view = st.session_state.get("print_view")
+                    if print_view is not None and print_view[0] != draft.letter_fields():
+                        # 편지 내용이 바뀌었으면 만들어 둔 인쇄 화면을 닫습니다.
+                        print_view = st.session_state.print_view = None
+                    if print_view is None:
+                        st.button("인쇄 화면 열기", on_click=request_print_view, help="작성한 편지를 인쇄용 화면으로 엽니다. 편지를 고치면 다시 열어야 합니다.")
+                    else:
+                        from letter_html import render_letter_html
+                        st.download_button(
+                            label="인쇄 화면 파일 받기",
+                            # 폰트를 넣은 HTML은 누를 때 만듭니다. (미리 만들어 세션에 들고 있지 않습니다.)
+                            data=functools.partial(render_letter_html, print_view[0]),
+                            file_name=f"{draft.selected_character}_편지.html",
+                            mime="text/html",
+                            help="인쇄 화면을 HTML 파일로 내려받습니다. 브라우저로 열어 인쇄하거나 PDF로 저장할 수 있습니다."
+                        )
+                else:
+                    st.session_state.print_view = None
+                    pdf_job = st.session_state.get("pdf_job")
+                    if pdf_job is not None and pdf_job.letter_fields != draft.letter_fields():
+                        # 편지 내용이 바뀌었으면 만들어 둔(또는 만드는 중인) PDF를 버립니다.
+                        discard_pdf_job()
+                        pdf_job = None
+                    if pdf_job is None:
+                        # PDF는 버튼을 눌렀을 때만 만듭니다. 그 전까지는 PDF 관련 작업을 전혀 하지 않습니다.
+                        st.button("PDF 만들기", on_click=request_pdf, help="작성한 편지로 PDF 파일을 만듭니다. 편지를 고치면 다시 만들어야 합니다.")
+                        if st.session_state.pop("pdf_queue_full", False):
+                            st.warning("지금 PDF를 만들려는 친구가 많습니다. 잠시 후 다시 'PDF 만들기'를 눌러 주세요.")
+                    elif not pdf_job.future.done():
+                        st.fragment(pdf_render_status, run_every=PDF_RENDER_POLL_INTERVAL)()
+                    else:
+                        load_pdf_stack() # 한글 폰트를 불러오지 못했으면 경고를 표시합니다.
+                        try:
+                            pdf_bytes = pdf_job.future.result()
+                        except Exception as e:
+                            st.session_state.pdf_job = None
+                            st.error(f"PDF를 만들지 못했습니다: {e}")
+                        else:
+                            with metrics.span("pdf_download_handoff"): # 완성된 PDF 바이트를 다운로드 버튼(미디어 저장소)에 넘기는 시간
+                                st.download_button(
+                                    label="PDF 출력",
+                                    data=pdf_bytes,
+                                    file_name=f"{draft.selected_character}_편지.pdf",
+                                    mime="application/pdf",
+                                    help="작성된 편지를 PDF 파일로 다운로드합니다."
+                                )
+                            from letter_pdf import missing_glyphs
+                            missing = missing_glyphs(pdf_job.letter_fields)
+                            if missing:
+                                # 서버에 그 글자를 담은 폰트(이모지 폰트 등)가 없습니다. (letter_pdf.FALLBACK_FONTS)
+                                st.caption(f"PDF에서 일부 글자({missing})는 빈 상자로 보일 수 있습니다. '인쇄 화면'으로 출력하면 브라우저의 글꼴로 보입니다.")
             else:
-                st.info("PDF 출력을 위해 모든 필수 항목(편지를 쓰는 '나', 등장인물, 사건, 나누려는 마음 요약, 편지 세부 내용)을 작성하고 점검 사항을 확인해주세요.")
+                discard_pdf_job()
+                st.session_state.print_view = None
+                # 모든 점검 항목이 '예'가 아니면 경고 메시지 표시
+                if not all_checked_yes:
+                    st.warning("답변한 내용을 참고해 글을 고쳐 써 봅시다. 모든 점검 항목을 '예'로 선택해야 PDF를 출력할 수 있습니다.")
+                # 필수 편지 내용이 누락된 경우 안내 메시지 표시
+                else:
+                    st.info("PDF 출력을 위해 모든 필수 항목(편지를 쓰는 '나', 등장인물, 사건, 나누려는 마음 요약, 편지 세부 내용)을 작성하고 점검 사항을 확인해주세요.")
+
+        print_view = st.session_state.get("print_view")
+        if print_view is not None:
+            # 인쇄 화면 미리보기. 안쪽의 '인쇄 / PDF로 저장' 버튼은 이 편지만 브라우저의 인쇄 창으로 보냅니다.
+            st.iframe(print_view[1], height=PRINT_VIEW_HEIGHT)
+
+        autosave_draft()
+        export_span.end()
+
+    letter_export_fragment()
 
 
     st.markdown("---")
@@ -436,3 +581,8 @@ elif st.session_state.current_step == 5:
     with col1:
         st.button("이전 화면", on_click=prev_step, help="이전 단계인 '나누려는 마음을 생각해요' 화면으로 돌아갑니다.")
 
+step_span.end()
+
+# --- 자동 저장 ---
+# 모든 위젯이 값을 반영한 뒤(스크립트 끝)에 바뀐 필드만 초안 저장소에 넘깁니다.
+autosave_draft()
@@ -0,0 +1,141 @@
+# --- 학급 편지 일괄 내보내기 ---
+# 여러 학생의 편지를 한꺼번에 PDF로 만듭니다.
+# - ZIP: 편지마다 PDF를 작업 프로세스 풀에서 병렬로 만들고, 끝나는 대로 ZIP에 바로 기록합니다.
+# - 합친 PDF: 편지 한 통이 한 페이지에서 시작하는 하나의 PDF. 한 문서로 만들기 때문에 폰트 서브셋이 한 번만 들어갑니다.
+# 동시에 처리 중인 편지 수를 제한하여, 300통을 내보내도 300개의 PDF 버퍼를 한꺼번에 들고 있지 않습니다.
+from collections import deque
+from reportlab.platypus import SimpleDocTemplate, PageBreak, Flowable
+from reportlab.lib.pagesizes import letter
+import json
+import os
+import re
+import zipfile
+
+from letter_pdf import LETTER_FIELDS, get_korean_style, build_letter_elements, render_letter_pdf
+from render_pool import process_pool
+
+# 작업 프로세스 수의 기본값 (CPU 코어 수)
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+
+def normalize_letter(record):
+    """입력 레코드(dict)를 generate_pdf가 받는 필드만 가진 dict로 정리합니다. 형식이 잘못되면 ValueError를 냅니다."""
+    if not isinstance(record, dict):
+        raise ValueError("편지 레코드는 JSON 객체여야 합니다.")
+    unknown = set(record) - set(LETTER_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    letter_fields = {}
+    for name in LETTER_FIELDS:
+        value = record.get(name, [] if name == "selected_emojis" else "")
+        if name == "selected_emojis":
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError("selected_emojis는 문자열 목록이어야 합니다.")
+        elif not isinstance(value, str):
+            raise ValueError(f"{name}은(는) 문자열이어야 합니다.")
+        letter_fields[name] = value
+    if not letter_fields["recipient_character"]:
+        raise ValueError("recipient_character(편지를 받는 사람)가 비어 있습니다.")
+    return letter_fields
+
+def render_jsonl_record(line):
+    """JSON Lines의 한 줄을 편지로 해석해 PDF 바이트를 만듭니다. (작업 프로세스에서 호출)"""
+    return render_letter_pdf(normalize_letter(json.loads(line)))
+
+def _result_or_exception(future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+def iter_rendered_letters(letters, max_workers=None, max_in_flight=None, render=render_letter_pdf, start_index=0):
+    """편지들을 작업 프로세스 풀에서 렌더링하여 입력 순서대로 (번호, PDF 바이트)를 내놓습니다.
+
+    letters는 리스트뿐 아니라 한 줄씩 읽어 오는 이터레이터여도 됩니다. 렌더링에 실패한 편지는
+    PDF 바이트 대신 예외 객체를 내놓고 다음 편지를 계속 처리합니다.
+    동시에 제출하는 편지는 max_in_flight개(기본: 작업 프로세스 수의 2배)로 제한됩니다.
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    max_in_flight = max_in_flight or max_workers * 2
+    with process_pool(max_workers) as pool:
+        pending = deque() # 제출 순서대로 쌓인 (번호, future)
+        for index, letter_fields in enumerate(letters, start_index):
+            pending.append((index, pool.submit(render, letter_fields)))
+            if len(pending) >= max_in_flight:
+                first_index, future = pending.popleft()
+                yield first_index, _result_or_exception(future)
+        for index, future in pending:
+            yield index, _result_or_exception(future)
+
+def _safe_file_name(text):
+    # ZIP 안의 파일 이름에 쓸 수 없는 문자는 '_'로 바꿉니다.
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", text).strip("_") or "편지"
+
+def export_zip(letters, output, progress=None, max_workers=None):
+    """편지마다 PDF 하나씩 담긴 ZIP을 output(파일 객체)에 기록하고, 만들지 못한 편지의 [(번호, 예외)] 목록을 돌려줍니다.
+
+    만들지 못한 편지는 건너뛰고 나머지 편지를 계속 기록합니다.
+    progress(done, total)가 주어지면 편지 한 통을 처리할 때마다 호출합니다.
+    """
+    letters = list(letters)
+    total = len(letters)
+    failures = []
+    # PDF는 이미 압축되어 있으므로 ZIP에서는 다시 압축하지 않습니다.
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for index, pdf_bytes in iter_rendered_letters(letters, max_workers=max_workers):
+            if isinstance(pdf_bytes, Exception):
+                failures.append((index, pdf_bytes))
+            else:
+                recipient = letters[index]["recipient_character"]
+                archive.writestr(f"{index + 1:03d}_{_safe_file_name(recipient)}_편지.pdf", pdf_bytes)
+            if progress:
+                progress(index + 1, total)
+    return failures
+
+class _LetterEnd(Flowable):
+    """합친 PDF에서 편지 한 통이 끝났음을 표시하는 크기 0의 요소. 진행률 보고에 사용합니다."""
+
+    def __init__(self, index):
+        Flowable.__init__(self)
+        self.index = index
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        pass
+
+class _MergedLetterDocTemplate(SimpleDocTemplate):
+    def __init__(self, *args, progress=None, total=0, **kwargs):
+        SimpleDocTemplate.__init__(self, *args, **kwargs)
+        self._progress = progress
+        self._total = total
+
+    def afterFlowable(self, flowable):
+        if self._progress and isinstance(flowable, _LetterEnd):
+            self._progress(flowable.index + 1, self._total)
+
+def export_merged_pdf(letters, output, progress=None):
+    """모든 편지를 한 통에 한 페이지씩 이어 붙인 하나의 PDF를 output(파일 객체)에 기록하고,
+    만들지 못한 편지의 [(번호, 예외)] 목록을 돌려줍니다.
+
+    하나의 문서로 만들기 때문에 한글 폰트 서브셋이 PDF 안에 한 번만 포함됩니다.
+    내용을 해석하지 못하는 편지(예: 닫히지 않은 <b> 태그)는 건너뛰고 나머지 편지로 문서를 만듭니다.
+    """
+    letters = list(letters)
+    korean_style = get_korean_style()
+    elements = []
+    failures = []
+    for index, letter_fields in enumerate(letters):
+        try:
+            letter_elements = build_letter_elements(korean_style, **letter_fields)
+        except Exception as e:
+            failures.append((index, e))
+            continue
+        if elements:
+            elements.append(PageBreak()) # 편지마다 새 페이지에서 시작합니다.
+        elements.extend(letter_elements)
+        elements.append(_LetterEnd(index))
+    if elements:
+        doc = _MergedLetterDocTemplate(output, pagesize=letter, progress=progress, total=len(letters))
+        doc.build(elements)
+    return failures
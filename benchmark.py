@@ -0,0 +1,278 @@
+# --- 성능 측정(벤치마크) 도구 ---
+# 앱이 느려졌는지 숫자로 확인하기 위한 도구입니다.
+# - 화면 1~5: Streamlit AppTest로 각 화면을 브라우저 없이 실행하여 스크립트 실행 시간을 잽니다.
+#   시작 시간과 화면 측정은 임시 초안 저장소를 쓰므로 실제 초안(drafts.sqlite3)에 측정용 편지가 남지 않습니다.
+# - 시작 시간: 새 프로세스에서 streamlit을 불러오고 첫 화면을 그리기까지 걸리는 시간을 재고,
+#   첫 화면을 그리는 동안 reportlab이 불러와지지 않았는지 확인합니다. (--startup-budget-ms를 넘으면 종료 코드 1)
+# - PDF: 짧은/한 쪽/보통/아주 긴 편지로 generate_pdf의 지연 시간, 처리량, 한 번 만들 때의 최대 메모리를 잽니다.
+#   한글 폰트(NanumGothic.ttf)를 쓴 경우와 쓰지 않은 경우를 각각 새 프로세스에서 측정하고,
+#   고정 배치(빠른 경로)를 끄고 platypus로만 만든 시간도 같은 프로세스에서 번갈아 재어 함께 보여줍니다.
+#
+# 사용 예:
+#   python benchmark.py -o bench_before.json
+#   python benchmark.py -o bench_after.json --compare bench_before.json   # 10% 넘게 나빠진 항목이 있으면 종료 코드 1
+#   python benchmark.py --only pdf --repeat 50
+#
+# 결과 파일(JSON)의 "metrics"는 {"항목 이름": {"value": 값, "unit": 단위, "better": "lower"|"higher"}} 형태입니다.
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+# 새 작업 프로세스를 띄웠을 때 첫 화면까지 허용하는 시간(밀리초)
+STARTUP_BUDGET_MS = 1500
+
+def _letter(size):
+    """측정용 편지 필드(letter_pdf.LETTER_FIELDS)를 만듭니다. size는 본문 한 칸의 대략적인 글자 수입니다."""
+    sentence = "아랑이가 낱말 카드를 만들어 엄마에게 한국말을 알려 주었어요. "
+    body = (sentence * (size // len(sentence) + 1))[:size]
+    return {
+        "writer_character": "나",
+        "recipient_character": "아랑",
+        "event_desc": body[:200],
+        "selected_emojis": ["슬프다 😢", "설레다 💖", "뿌듯하다 👍"],
+        "shared_feelings_summary": body[:200],
+        "intro": "아랑아, 안녕? 나는 「까만 달걀」을 읽은 친구야.",
+        "event_detail": body,
+        "my_thoughts": body,
+        "shared_feelings_detail": body,
+        "closing": "그럼 안녕. 다음에 또 편지할게.",
+        "writer_name": "OO이가",
+    }
+
+# 짧은 편지(몇 줄), 한 쪽을 거의 채우는 편지, 보통 편지(두 쪽 안팎), 아주 긴 편지(여러 쪽)
+PDF_LETTER_SIZES = {"short": 40, "page": 200, "typical": 400, "long": 8000}
+
+def _summarize(samples_ms):
+    samples_ms = sorted(samples_ms)
+    return {
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))],
+        "min_ms": samples_ms[0],
+    }
+
+def bench_pdf(use_font, repeat):
+    """generate_pdf를 편지 길이별로 측정합니다. 폰트 등록 상태가 섞이지 않도록 새 작업 프로세스에서 호출합니다.
+
+    같은 프로세스에서 고정 배치를 끈 platypus 경로도 번갈아 만들어, 두 경로를 같은 조건에서 비교합니다.
+    """
+    import letter_pdf
+    if not use_font:
+        letter_pdf.KOREAN_FONT_PATH = os.path.join(os.path.dirname(letter_pdf.KOREAN_FONT_PATH), 'missing-font.ttf')
+    diagnostic = letter_pdf.load_korean_font()
+    results = {"font_registered": diagnostic["registered"], "font_load_ms": diagnostic["load_ms"], "letters": {}}
+    for name, size in PDF_LETTER_SIZES.items():
+        letter_fields = _letter(size)
+        pdf_bytes = letter_pdf.render_letter_pdf(letter_fields) # 첫 실행(준비 작업)은 측정하지 않습니다.
+        letter_pdf.generate_pdf(**letter_fields, fixed_layout=False)
+        samples = []
+        platypus_samples = []
+        for _ in range(repeat):
+            render_started = time.perf_counter()
+            letter_pdf.render_letter_pdf(letter_fields)
+            samples.append((time.perf_counter() - render_started) * 1000)
+            render_started = time.perf_counter()
+            letter_pdf.generate_pdf(**letter_fields, fixed_layout=False)
+            platypus_samples.append((time.perf_counter() - render_started) * 1000)
+        # 메모리 측정은 tracemalloc 때문에 느려지므로 시간 측정과 따로 합니다.
+        tracemalloc.start()
+        letter_pdf.render_letter_pdf(letter_fields)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["letters"][name] = {
+            **_summarize(samples),
+            "letters_per_s": 1000 / statistics.mean(samples),
+            "peak_bytes": peak,
+            "pdf_bytes": len(pdf_bytes),
+            # 실제로 쓰인 경로 (한 쪽을 넘치거나 한글 폰트가 없으면 platypus로 만듭니다.)
+            "engine": "fixed" if letter_pdf.layout_fixed_letter(**letter_fields) is not None else "platypus",
+            "platypus_median_ms": statistics.median(platypus_samples),
+        }
+    return results
+
+def bench_steps(repeat):
+    """화면 1~5를 AppTest로 실행하여 화면별 스크립트 실행(재실행) 시간을 잽니다."""
+    from streamlit.testing.v1 import AppTest
+    from letter_draft import LetterDraft
+
+    letter_fields = _letter(PDF_LETTER_SIZES["typical"])
+    filled_draft = LetterDraft(
+        writer_character="나", selected_character="아랑", event_description=letter_fields["event_desc"],
+        emotion_indices=(1, 14, 24), shared_feelings=letter_fields["shared_feelings_summary"],
+        letter_intro=letter_fields["intro"], letter_event_detail=letter_fields["event_detail"],
+        letter_my_thoughts_actions=letter_fields["my_thoughts"],
+        letter_shared_feelings_detail=letter_fields["shared_feelings_detail"],
+        letter_closing=letter_fields["closing"], letter_writer_name=letter_fields["writer_name"],
+        check_event_detail=True, check_express_feelings=True, check_easy_expression=True,
+    )
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"앱 실행 중 오류: {at.exception[0].message}")
+    results = {}
+    for step in range(1, 6):
+        draft = filled_draft.copy()
+        draft.current_step = step
+        at.session_state.letter_draft = draft
+        at.run() # 화면을 처음 그리는 실행(준비 작업)은 측정하지 않습니다.
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            at.run()
+            samples.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{step}번째 화면 실행 중 오류: {at.exception[0].message}")
+        results[f"step{step}"] = _summarize(samples)
+    return results
+
+def bench_startup():
+    """새 프로세스에서 streamlit을 불러오고 앱의 첫 화면(화면 1)을 그리기까지의 시간을 잽니다."""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import_ms = (time.perf_counter() - started) * 1000
+    # 초안 ID 없이 열어 새 세션처럼 화면 1에서 시작합니다.
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    run_started = time.perf_counter()
+    at.run()
+    first_run_ms = (time.perf_counter() - run_started) * 1000
+    if at.exception:
+        raise RuntimeError(f"앱 실행 중 오류: {at.exception[0].message}")
+    return {
+        "streamlit_import_ms": streamlit_import_ms,
+        "first_run_ms": first_run_ms, # 앱 모듈을 불러오는 시간 + 첫 스크립트 실행
+        "first_paint_ms": streamlit_import_ms + first_run_ms,
+        "reportlab_loaded": any(name.split(".")[0] == "reportlab" for name in sys.modules),
+    }
+
+def _in_fresh_process(name, *args):
+    # forkserver/spawn으로 새 프로세스를 만들어야 이전 측정에서 불러온 모듈과 등록된 폰트가 남아 있지 않습니다.
+    # AppTest가 __main__ 모듈을 바꿔 놓으므로, 작업 프로세스에는 모듈 이름으로 찾을 수 있는 함수를 넘깁니다.
+    import benchmark
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(start_method)) as pool:
+        return pool.submit(getattr(benchmark, name), *args).result()
+
+@contextlib.contextmanager
+def _temporary_draft_db():
+    # 화면 측정은 앱을 그대로 실행하므로 다 쓴 측정용 편지가 초안 저장소에 저장됩니다. 실제 초안(drafts.sqlite3)과 섞여
+    # 교사용 현황판에 나오지 않도록, 측정하는 동안에는 임시 초안 저장소(LETTER_DRAFT_DB_PATH)를 씁니다.
+    # 환경 변수는 새로 띄우는 측정 프로세스에도 그대로 전해집니다.
+    previous = os.environ.get("LETTER_DRAFT_DB_PATH")
+    with tempfile.TemporaryDirectory(prefix="letter-bench-") as temp_dir:
+        os.environ["LETTER_DRAFT_DB_PATH"] = os.path.join(temp_dir, "drafts.sqlite3")
+        try:
+            yield
+        finally:
+            if previous is None:
+                del os.environ["LETTER_DRAFT_DB_PATH"]
+            else:
+                os.environ["LETTER_DRAFT_DB_PATH"] = previous
+
+def collect_metrics(results):
+    """측정 결과를 비교하기 쉬운 평평한 항목 목록으로 바꿉니다."""
+    metrics = {}
+    startup = results.get("startup")
+    if startup:
+        metrics["startup.first_paint_ms"] = {"value": startup["first_paint_ms"], "unit": "ms", "better": "lower"}
+        metrics["startup.first_run_ms"] = {"value": startup["first_run_ms"], "unit": "ms", "better": "lower"}
+    for step, summary in results.get("steps", {}).items():
+        metrics[f"rerun.{step}.median_ms"] = {"value": summary["median_ms"], "unit": "ms", "better": "lower"}
+        metrics[f"rerun.{step}.p95_ms"] = {"value": summary["p95_ms"], "unit": "ms", "better": "lower"}
+    for font_mode, pdf_results in results.get("pdf", {}).items():
+        for name, summary in pdf_results["letters"].items():
+            prefix = f"pdf.{font_mode}.{name}"
+            metrics[f"{prefix}.median_ms"] = {"value": summary["median_ms"], "unit": "ms", "better": "lower"}
+            metrics[f"{prefix}.p95_ms"] = {"value": summary["p95_ms"], "unit": "ms", "better": "lower"}
+            metrics[f"{prefix}.letters_per_s"] = {"value": summary["letters_per_s"], "unit": "letters/s", "better": "higher"}
+            metrics[f"{prefix}.peak_bytes"] = {"value": summary["peak_bytes"], "unit": "bytes", "better": "lower"}
+    return metrics
+
+def compare(metrics, baseline_metrics, threshold):
+    """기준 결과와 비교하여 (항목, 기준 값, 현재 값, 변화율, 나빠졌는지) 목록을 돌려줍니다."""
+    rows = []
+    for name, metric in metrics.items():
+        base = baseline_metrics.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = change > threshold if metric["better"] == "lower" else change < -threshold
+        rows.append((name, base["value"], metric["value"], change, worse))
+    return rows
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="화면 재실행 시간과 PDF 생성 성능을 측정합니다.")
+    parser.add_argument("-o", "--output", default="bench_output.json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--repeat", type=int, default=20, help="항목마다 측정할 횟수 (기본: 20)")
+    parser.add_argument("--only", choices=["startup", "steps", "pdf"], help="한 가지 측정만 실행합니다.")
+    parser.add_argument("--compare", metavar="BASELINE", help="이전 결과 파일과 비교합니다.")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"첫 화면까지 허용하는 시간 (기본: {STARTUP_BUDGET_MS}ms)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="나빠졌다고 판단할 변화율 (기본: 0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    failures = []
+    with _temporary_draft_db():
+        if args.only in (None, "startup"):
+            results["startup"] = _in_fresh_process("bench_startup")
+            if results["startup"]["first_paint_ms"] > args.startup_budget_ms:
+                failures.append(f"첫 화면까지 {results['startup']['first_paint_ms']:.0f}ms 걸려 예산 {args.startup_budget_ms:.0f}ms를 넘었습니다.")
+            if results["startup"]["reportlab_loaded"]:
+                failures.append("첫 화면을 그리는 동안 reportlab을 불러왔습니다. PDF 모듈은 PDF가 필요할 때 불러와야 합니다.")
+        if args.only in (None, "steps"):
+            # 초안 저장소의 경로는 모듈을 불러올 때 정해지므로, 임시 저장소를 쓰도록 새 프로세스에서 측정합니다.
+            results["steps"] = _in_fresh_process("bench_steps", args.repeat)
+    if args.only in (None, "pdf"):
+        results["pdf"] = {
+            "font": _in_fresh_process("bench_pdf", True, args.repeat),
+            "no_font": _in_fresh_process("bench_pdf", False, args.repeat),
+        }
+        if not results["pdf"]["font"]["font_registered"]:
+            print("경고: NanumGothic.ttf를 불러오지 못해 'font' 측정도 기본 폰트로 실행되었습니다.", file=sys.stderr)
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "metrics": collect_metrics(results),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for name, metric in report["metrics"].items():
+        print(f"{name:45s} {metric['value']:12.2f} {metric['unit']}")
+    if "pdf" in results:
+        print("\n기본 경로 / platypus만 사용 (중앙값):")
+        for font_mode, pdf_results in results["pdf"].items():
+            for name, summary in pdf_results["letters"].items():
+                platypus_ms = summary["platypus_median_ms"]
+                print(f"{font_mode:8s} {name:8s} {summary['engine']:9s} {summary['median_ms']:8.2f}ms / {platypus_ms:8.2f}ms  x{platypus_ms / summary['median_ms']:.2f}")
+    for failure in failures:
+        print(f"실패: {failure}", file=sys.stderr)
+    if not args.compare:
+        return 1 if failures else 0
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(report["metrics"], baseline["metrics"], args.threshold)
+    print(f"\n{args.compare}와 비교 (기준을 {args.threshold:.0%} 넘게 벗어나면 '나빠짐'):")
+    for name, base_value, value, change, worse in rows:
+        print(f"{name:45s} {base_value:12.2f} -> {value:12.2f} {change:+8.1%}{'  나빠짐' if worse else ''}")
+    return 1 if failures or any(worse for *_, worse in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
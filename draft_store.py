@@ -0,0 +1,318 @@
+# --- 편지 임시 저장소 ---
+# 세션 상태(st.session_state)는 새로고침하거나 서버 작업 프로세스가 다시 시작되면 사라지므로,
+# 작성 중인 편지를 로컬 SQLite 파일(WAL 모드)에 저장해 두었다가 초안 ID로 다시 불러옵니다.
+#
+# 학생들이 동시에 입력해도 쓰기가 몰리지 않도록, 바뀐 필드는 먼저 메모리에 모아 두고(stage)
+# 백그라운드 스레드가 flush_interval초마다 모인 변경 사항을 한 번의 트랜잭션으로 기록합니다.
+#
+# 교사용 현황판(teacher_dashboard.py)을 위해 같은 트랜잭션 안에서 학급 집계도 함께 고칩니다.
+# - draft_summary / draft_emotions: 초안마다 받는 사람, 쓰는 사람, 감정 등을 색인된 표로 따로 보관합니다.
+# - class_counts: (집계 이름, 키) -> 초안 수. 초안이 바뀔 때 이전 값의 몫을 빼고 새 값의 몫을 더합니다.
+# 그래서 현황판은 편지가 몇 천 통이어도 전체를 다시 읽지 않고 집계 행 몇십 개만 읽습니다.
+from collections import Counter
+import atexit
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from letter_draft import LetterDraft, CHECK_QUESTIONS
+
+logger = logging.getLogger(__name__)
+
+# 초안 데이터베이스 파일 경로 (LETTER_DRAFT_DB_PATH 환경 변수로 바꿀 수 있습니다. 부하 시험 등에서 실제 초안과 섞이지 않게 할 때 씁니다.)
+DRAFT_DB_PATH = os.environ.get('LETTER_DRAFT_DB_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'drafts.sqlite3')
+# 모아 둔 변경 사항을 디스크에 기록하는 간격(초)
+DRAFT_FLUSH_INTERVAL = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drafts_by_updated_at ON drafts (updated_at);
+CREATE TABLE IF NOT EXISTS draft_fields (
+    draft_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (draft_id, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS draft_summary (
+    draft_id TEXT PRIMARY KEY,
+    writer_character TEXT NOT NULL,
+    selected_character TEXT NOT NULL,
+    max_step INTEGER NOT NULL,
+    ready INTEGER NOT NULL,
+    check_event_detail INTEGER,
+    check_express_feelings INTEGER,
+    check_easy_expression INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS draft_summary_by_recipient ON draft_summary (selected_character, writer_character);
+CREATE INDEX IF NOT EXISTS draft_summary_by_writer ON draft_summary (writer_character);
+CREATE TABLE IF NOT EXISTS draft_emotions (
+    emotion_index INTEGER NOT NULL,
+    draft_id TEXT NOT NULL,
+    PRIMARY KEY (emotion_index, draft_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS draft_emotions_by_draft ON draft_emotions (draft_id);
+CREATE TABLE IF NOT EXISTS class_counts (
+    metric TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, key)
+) WITHOUT ROWID;
+"""
+
+# 찾아보기(find_drafts) 결과의 기본 최대 개수
+FIND_DRAFTS_LIMIT = 200
+
+def _summarize(fields, previous_max_step=1):
+    """초안 필드로 draft_summary 행(초안 ID 제외)과 선택된 감정 번호 집합을 만듭니다."""
+    draft = LetterDraft.from_fields(fields)
+    checks = [None if getattr(draft, name) is None else int(getattr(draft, name)) for name in CHECK_QUESTIONS]
+    summary = (
+        draft.writer_character,
+        draft.selected_character,
+        max(draft.current_step, previous_max_step), # 이전 화면으로 돌아가도 가장 멀리 간 단계를 기억합니다.
+        int(draft.is_complete() and draft.all_checked_yes()), # PDF로 출력할 수 있는 상태인지
+        *checks,
+    )
+    return summary, set(draft.emotion_indices)
+
+def _count_keys(summary, emotions):
+    """초안 하나가 class_counts에 더하는 (집계 이름, 키) 목록"""
+    writer, recipient, max_step, ready, *checks = summary
+    keys = [("drafts", "")]
+    if writer:
+        keys.append(("writer", writer))
+    if recipient:
+        keys.append(("recipient", recipient))
+    keys += [("step_reached", str(step)) for step in range(1, max_step + 1)]
+    if ready:
+        keys.append(("ready", ""))
+    for name, answer in zip(CHECK_QUESTIONS, checks):
+        if answer is not None:
+            keys.append(("check_answered", name))
+            if answer == 0:
+                keys.append(("check_no", name))
+    keys += [("emotion", str(index)) for index in emotions]
+    return keys
+
+def new_draft_id():
+    """URL에 넣기 좋은 짧은 무작위 초안 ID를 만듭니다."""
+    return secrets.token_urlsafe(9)
+
+class DraftStore:
+    """SQLite(WAL)에 초안 필드를 저장합니다. 여러 세션(스레드)이 하나의 객체를 함께 사용합니다."""
+
+    def __init__(self, path=DRAFT_DB_PATH, flush_interval=DRAFT_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL") # WAL에서는 NORMAL로도 손상 없이 안전합니다.
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock() # 연결 하나를 여러 스레드가 쓰므로 잠금으로 순서를 지킵니다.
+        self._backfill_summaries()
+        self._pending = {} # 초안 ID -> {필드: 값}, 아직 기록하지 않은 변경 사항
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="draft-store-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def stage(self, draft_id, changed_fields):
+        """바뀐 필드를 기록 대기열에 넣습니다. 같은 필드가 다시 바뀌면 마지막 값만 기록됩니다."""
+        if not changed_fields:
+            return
+        with self._pending_lock:
+            self._pending.setdefault(draft_id, {}).update(changed_fields)
+
+    def flush(self, draft_ids=None):
+        """대기 중인 모든 변경 사항(draft_ids를 주면 그 초안들의 변경 사항만)을 한 트랜잭션으로 기록합니다."""
+        # 대기열을 비우는 일과 기록을 한 잠금(_db_lock) 안에서 합니다. 백그라운드 기록과 '저장' 버튼의 기록이 겹쳐도
+        # 먼저 꺼낸 변경 사항이 먼저 기록되므로, 이전 값(과 class_counts 증감)이 더 새 값을 덮어쓰지 않습니다.
+        # 잠금 순서는 항상 _db_lock → _pending_lock입니다.
+        with self._db_lock:
+            with self._pending_lock:
+                if draft_ids is None:
+                    pending, self._pending = self._pending, {}
+                else:
+                    pending = {draft_id: self._pending.pop(draft_id) for draft_id in draft_ids if draft_id in self._pending}
+            if not pending:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                now = time.time()
+                rows = [
+                    (draft_id, field, json.dumps(value, ensure_ascii=False))
+                    for draft_id, fields in pending.items()
+                    for field, value in fields.items()
+                ]
+                self._conn.executemany(
+                    "INSERT INTO drafts (draft_id, created_at, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(draft_id) DO UPDATE SET updated_at = excluded.updated_at",
+                    [(draft_id, now, now) for draft_id in pending],
+                )
+                self._conn.executemany(
+                    "INSERT INTO draft_fields (draft_id, field, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT(draft_id, field) DO UPDATE SET value = excluded.value",
+                    rows,
+                )
+                self._refresh_summaries(pending)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # 기록에 실패한 변경 사항은 다음 기록 때 다시 시도합니다. (그사이 더 새 값이 들어왔으면 그 값을 유지)
+                with self._pending_lock:
+                    for draft_id, fields in pending.items():
+                        self._pending[draft_id] = {**fields, **self._pending.get(draft_id, {})}
+                raise
+
+    def load(self, draft_id):
+        """초안의 모든 필드를 한 번의 조회로 읽어 dict로 돌려줍니다. 없는 초안이면 None을 돌려줍니다."""
+        # 기록 중인 변경 사항을 놓치지 않도록 저장된 값과 대기 중인 값을 같은 잠금 안에서 읽습니다.
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT field, value FROM draft_fields WHERE draft_id = ?", (draft_id,)
+            ).fetchall()
+            with self._pending_lock:
+                staged = dict(self._pending.get(draft_id, {}))
+        if not rows and not staged:
+            return None
+        fields = {field: json.loads(value) for field, value in rows}
+        fields.update(staged) # 아직 기록되지 않은 최신 값이 있으면 그 값을 사용합니다.
+        return fields
+
+    def _refresh_summaries(self, draft_ids):
+        """초안들의 요약 행과 감정 색인을 다시 만들고, 바뀐 만큼만 class_counts에 반영합니다. 트랜잭션 안에서 호출합니다."""
+        deltas = Counter()
+        for draft_id in draft_ids:
+            fields = {
+                field: json.loads(value) for field, value in self._conn.execute(
+                    "SELECT field, value FROM draft_fields WHERE draft_id = ?", (draft_id,)
+                )
+            }
+            old_row = self._conn.execute(
+                "SELECT writer_character, selected_character, max_step, ready, "
+                "check_event_detail, check_express_feelings, check_easy_expression "
+                "FROM draft_summary WHERE draft_id = ?", (draft_id,)
+            ).fetchone()
+            old_emotions = {
+                index for (index,) in self._conn.execute(
+                    "SELECT emotion_index FROM draft_emotions WHERE draft_id = ?", (draft_id,)
+                )
+            }
+            summary, emotions = _summarize(fields, old_row[2] if old_row else 1)
+            if old_row is not None and tuple(old_row) == summary and old_emotions == emotions:
+                continue
+            if old_row is not None:
+                deltas.subtract(_count_keys(tuple(old_row), old_emotions))
+            deltas.update(_count_keys(summary, emotions))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO draft_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (draft_id, *summary)
+            )
+            self._conn.executemany(
+                "DELETE FROM draft_emotions WHERE emotion_index = ? AND draft_id = ?",
+                [(index, draft_id) for index in old_emotions - emotions],
+            )
+            self._conn.executemany(
+                "INSERT INTO draft_emotions (emotion_index, draft_id) VALUES (?, ?)",
+                [(index, draft_id) for index in emotions - old_emotions],
+            )
+        self._conn.executemany(
+            "INSERT INTO class_counts (metric, key, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(metric, key) DO UPDATE SET count = count + excluded.count",
+            [(metric, key, delta) for (metric, key), delta in deltas.items() if delta],
+        )
+
+    def _backfill_summaries(self):
+        """집계 표가 생기기 전에 저장된 초안이 있으면 한 번만 요약을 만들어 넣습니다."""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE") # 다른 프로세스와 동시에 채우지 않도록 먼저 쓰기 잠금을 잡습니다.
+            try:
+                missing = [
+                    draft_id for (draft_id,) in self._conn.execute(
+                        "SELECT draft_id FROM drafts WHERE draft_id NOT IN (SELECT draft_id FROM draft_summary)"
+                    )
+                ]
+                self._refresh_summaries(missing)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def class_counts(self):
+        """학급 집계를 {집계 이름: {키: 초안 수}} dict로 돌려줍니다. 아직 기록되지 않은 변경 사항은 다음 기록 뒤에 반영됩니다."""
+        with self._db_lock:
+            rows = self._conn.execute("SELECT metric, key, count FROM class_counts WHERE count > 0").fetchall()
+        counts = {}
+        for metric, key, count in rows:
+            counts.setdefault(metric, {})[key] = count
+        return counts
+
+    def find_drafts(self, recipient=None, writer=None, emotion_index=None, limit=FIND_DRAFTS_LIMIT):
+        """조건에 맞는 초안의 요약을 최근에 고친 순서로 돌려줍니다. 조건마다 색인을 타므로 전체 초안을 훑지 않습니다."""
+        conditions = []
+        params = []
+        if emotion_index is not None:
+            source = "draft_emotions e JOIN draft_summary s ON s.draft_id = e.draft_id"
+            conditions.append("e.emotion_index = ?")
+            params.append(emotion_index)
+        else:
+            source = "draft_summary s"
+        if recipient is not None:
+            conditions.append("s.selected_character = ?")
+            params.append(recipient)
+        if writer is not None:
+            conditions.append("s.writer_character = ?")
+            params.append(writer)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT s.draft_id, s.writer_character, s.selected_character, s.max_step, s.ready, d.updated_at "
+                f"FROM {source} JOIN drafts d ON d.draft_id = s.draft_id {where} "
+                f"ORDER BY d.updated_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        keys = ("draft_id", "writer_character", "selected_character", "max_step", "ready", "updated_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass # 잠시 잠긴 경우 등은 다음 주기에 다시 시도합니다.
+            except Exception:
+                # 그 밖의 오류로 이 스레드가 멈추면 프로세스 전체의 자동 저장이 멈춥니다. 오류를 기록하고 초안별로 나눠 다시 기록하여,
+                # 기록할 수 없는 초안 하나가 다른 초안의 저장을 막지 않게 합니다.
+                logger.exception("초안 자동 저장에 실패했습니다. 초안별로 나눠 다시 기록합니다.")
+                self._flush_each()
+
+    def _flush_each(self):
+        with self._pending_lock:
+            draft_ids = list(self._pending)
+        for draft_id in draft_ids:
+            try:
+                self.flush([draft_id])
+            except sqlite3.Error:
+                return # 잠시 잠긴 경우 등은 다음 주기에 다시 시도합니다.
+            except Exception:
+                # 다시 시도해도 같은 오류가 나므로 이 초안의 대기 중인 변경 사항은 버립니다.
+                logger.exception("초안 %s의 변경 사항을 기록하지 못해 버립니다.", draft_id)
+                with self._pending_lock:
+                    self._pending.pop(draft_id, None)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flusher.join(timeout=self.flush_interval * 2)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
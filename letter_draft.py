@@ -0,0 +1,159 @@
+# --- 편지 초안 모델 ---
+# 한 세션에서 작성 중인 편지를 LetterDraft 객체 하나에 모아 st.session_state.letter_draft 아래에 보관합니다.
+# 위젯 값과 별도의 세션 상태 키를 두 벌씩 들고 있지 않도록, 위젯은 이 객체의 필드를 직접 읽고 고칩니다.
+# 감정은 "무섭다 😨" 같은 표시 문자열 대신 EMOTIONS의 번호(index)로 저장합니다.
+# 화면 제목과 선택지 같은 상수도 여기에 두어, 스크립트가 다시 실행될 때마다 새로 만들지 않고 프로세스당 한 번만 만듭니다.
+from dataclasses import dataclass, fields, replace
+
+# 화면 단계별 제목 (내비게이션 바에 표시)
+STEP_TITLES = {
+    1: "편지를 쓰는 '나'는 누구인가요?",
+    2: "마음을 전하고 싶은 등장인물을 선택해요",
+    3: "일어난 사건을 떠올려요",
+    4: "나누려는 마음을 생각해요",
+    5: "나누려는 마음을 담아 글을 써보세요"
+}
+
+# 편지를 쓰는 주체 선택지
+WRITER_OPTIONS = ("나", "아랑이", "아랑이의 어머니", "재현", "재현이의 아버지", "성구", "달이", "운철이", "달이의 아버지")
+# 편지를 받을 등장인물 선택지 ("달이의 아버지"는 받는 대상에서는 제외)
+RECIPIENT_OPTIONS = ("아랑", "아랑이의 어머니", "재현", "재현이의 아버지", "성구", "달이", "운철이")
+
+# 감정 이름과 해당 이모지. 초안에는 이 목록의 번호가 저장되므로 순서를 바꾸지 말고 뒤에만 추가합니다.
+EMOTIONS = (
+    ("무섭다", "😨"), ("슬프다", "😢"), ("외롭다", "😔"), ("짜증나다", "😤"), ("화나다", "😡"),
+    ("신나다", "🤩"), ("행복하다", "😊"), ("당황하다", "😳"), ("미안하다", "🙏"), ("창피하다", "😳"),
+    ("억울하다", "😩"), ("즐겁다", "😄"), ("답답하다", "😐"), ("걱정되다", "😟"), ("설레다", "💖"),
+    ("샘나다", "😒"), ("실망하다", "😞"), ("울고싶다", "😭"), ("부끄럽다", "😳"), ("재미있다", "😂"),
+    ("편안하다", "😌"), ("기쁘다", "🥳"), ("얄밉다", "😠"), ("속상하다", "💔"), ("뿌듯하다", "👍"),
+    ("우울하다", "😔"), ("서운하다", "😔"), ("만족하다", "😌"), ("불안하다", "😬"), ("놀라다", "😲"),
+    ("쓸쓸하다", "🍂"), ("신경질나다", "😠"), ("아쉽다", "😟"), ("약오르다", "😤"), ("후회되다", "🤦‍♀️"),
+)
+# 멀티셀렉트 박스와 PDF에 표시될 감정 문자열 (예: "무섭다 😨")
+EMOTION_LABELS = tuple(f"{name} {emoji}" for name, emoji in EMOTIONS)
+_EMOTION_INDEX_BY_LABEL = {label: index for index, label in enumerate(EMOTION_LABELS)}
+
+# 점검 항목 답변. 초안에는 True('예') / False('아니오') / None(아직 답하지 않음)으로 저장합니다.
+CHECK_LABELS = {True: "예", False: "아니오"}
+# 점검 항목 필드 이름과 질문
+CHECK_QUESTIONS = {
+    "check_event_detail": "1) 일어난 사건을 자세히 밝혔나요?",
+    "check_express_feelings": "2) 나누려는 마음을 잘 표현했나요?",
+    "check_easy_expression": "3) 읽을 사람을 생각해 알기 쉬운 표현을 썼나요?",
+}
+
+# 1인치 = 72pt (reportlab.lib.units.inch와 같은 값)
+INCH = 72.0
+
+def letter_blocks(recipient_character, event_desc, selected_emojis, shared_feelings_summary,
+                  intro, event_detail, my_thoughts, shared_feelings_detail, closing, writer_name,
+                  writer_character=""):
+    """편지 한 통의 문단 목록. 각 문단은 (굵게 쓸 앞부분, 나머지 글, 문단 아래 여백(pt)) 튜플입니다.
+    PDF(letter_pdf.py)와 인쇄 화면(letter_html.py)이 같은 구조로 편지를 그리도록 함께 사용합니다."""
+    # 편지 제목 (받는 사람)
+    blocks = [(f"{recipient_character}에게", "", 0.3 * INCH)]
+
+    # 편지 내용 (각 파트별로 추가)
+    for text in (intro, event_detail, my_thoughts, shared_feelings_detail):
+        if text:
+            blocks.append(("", text, 0.1 * INCH))
+    if closing:
+        blocks.append(("", closing, 0.2 * INCH))
+
+    # 글을 쓴 사람 (마지막에 추가)
+    if writer_name:
+        blocks.append((writer_name, "", 0.5 * INCH))
+
+    # --- 편지 작성 참고 정보 (PDF 하단에 추가) ---
+    blocks += [
+        ("", "--- 편지 작성 참고 정보 ---", 0.15 * INCH),
+        ("편지를 쓰는 사람:", writer_character, 0),
+        ("편지를 받는 사람:", recipient_character, 0),
+        ("일어난 사건 요약:", event_desc, 0),
+        ("등장인물의 감정:", ' '.join(selected_emojis), 0),
+        ("나누고자 하는 마음 요약:", shared_feelings_summary, 0),
+    ]
+    return blocks
+
+@dataclass(slots=True)
+class LetterDraft:
+    """한 학생이 작성 중인 편지. 필드 이름이 그대로 초안 저장소(draft_store.py)의 필드 이름이 됩니다."""
+
+    current_step: int = 1 # 현재 앱 화면 단계
+    writer_character: str = "" # 편지를 쓰는 '나'
+    selected_character: str = "" # 편지를 받을 등장인물 이름
+    event_description: str = "" # 등장인물이 겪은 사건 설명
+    emotion_indices: tuple = () # 선택된 감정의 EMOTIONS 번호
+    shared_feelings: str = "" # 등장인물에게 나누고 싶은 마음
+    letter_intro: str = "" # 편지 - 첫인사
+    letter_event_detail: str = "" # 편지 - 일어난 사건
+    letter_my_thoughts_actions: str = "" # 편지 - 일어난 사건에 대한 자신의 생각이나 행동
+    letter_shared_feelings_detail: str = "" # 편지 - 나누려는 마음
+    letter_closing: str = "" # 편지 - 끝인사
+    letter_writer_name: str = "" # 편지를 쓴 사람
+    check_event_detail: bool | None = None # 점검 1: 일어난 사건 자세히 밝혔나요?
+    check_express_feelings: bool | None = None # 점검 2: 나누려는 마음 잘 표현했나요?
+    check_easy_expression: bool | None = None # 점검 3: 읽을 사람을 생각해 알기 쉬운 표현을 썼나요?
+
+    @classmethod
+    def from_fields(cls, saved_fields):
+        """초안 저장소에서 읽은 dict로 초안을 만듭니다. 모르는 필드는 무시하고, 예전 형식의 값은 새 형식으로 바꿉니다."""
+        saved_fields = dict(saved_fields)
+        # 예전 초안은 감정을 표시 문자열 목록(selected_emojis)으로, 점검 답변을 '예'/'아니오'로 저장했습니다.
+        if "selected_emojis" in saved_fields and "emotion_indices" not in saved_fields:
+            saved_fields["emotion_indices"] = [
+                _EMOTION_INDEX_BY_LABEL[label] for label in saved_fields["selected_emojis"] if label in _EMOTION_INDEX_BY_LABEL
+            ]
+        for name in CHECK_QUESTIONS:
+            if isinstance(saved_fields.get(name), str):
+                saved_fields[name] = saved_fields[name] == "예"
+        draft = cls()
+        for field in fields(cls):
+            if field.name in saved_fields:
+                setattr(draft, field.name, saved_fields[field.name])
+        draft.emotion_indices = tuple(draft.emotion_indices)
+        return draft
+
+    def copy(self):
+        return replace(self)
+
+    def changed_fields(self, other):
+        """other와 값이 다른 필드만 {필드 이름: 값} dict로 돌려줍니다. (초안 저장소에 그대로 넘길 수 있는 형태)"""
+        changed = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value != getattr(other, field.name):
+                changed[field.name] = list(value) if isinstance(value, tuple) else value
+        return changed
+
+    @property
+    def selected_emojis(self):
+        """선택된 감정의 표시 문자열 목록 (예: ["무섭다 😨", "슬프다 😢"])"""
+        return [EMOTION_LABELS[index] for index in self.emotion_indices]
+
+    def all_checked_yes(self):
+        return self.check_event_detail is True and self.check_express_feelings is True and self.check_easy_expression is True
+
+    def is_complete(self):
+        """PDF 출력에 필요한 내용 칸이 모두 채워졌는지 확인합니다."""
+        return all((
+            self.writer_character, self.selected_character, self.event_description, self.shared_feelings,
+            self.letter_intro, self.letter_event_detail, self.letter_my_thoughts_actions,
+            self.letter_shared_feelings_detail, self.letter_closing, self.letter_writer_name,
+        ))
+
+    def letter_fields(self):
+        """generate_pdf가 받는 필드(letter_pdf.LETTER_FIELDS) dict를 만듭니다."""
+        return {
+            "writer_character": self.writer_character,
+            "recipient_character": self.selected_character,
+            "event_desc": self.event_description,
+            "selected_emojis": self.selected_emojis,
+            "shared_feelings_summary": self.shared_feelings,
+            "intro": self.letter_intro,
+            "event_detail": self.letter_event_detail,
+            "my_thoughts": self.letter_my_thoughts_actions,
+            "shared_feelings_detail": self.letter_shared_feelings_detail,
+            "closing": self.letter_closing,
+            "writer_name": self.letter_writer_name,
+        }
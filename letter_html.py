@@ -0,0 +1,177 @@
+# --- 편지 인쇄 화면(HTML) 모듈 ---
+# 서버에서 PDF를 만드는 대신, 인쇄용 스타일을 입힌 HTML 한 장을 브라우저로 보내 브라우저의 "PDF로 저장/인쇄"로 출력합니다.
+# 한 학급이 한꺼번에 5단계를 마쳐도 서버는 글자만 HTML로 옮기므로, PDF를 만드는 CPU 작업이 몰리지 않습니다.
+#
+# - 내용과 "편지 작성 참고 정보"는 PDF와 같은 구조(letter_draft.letter_blocks)로 만들고, 쪽 크기와 여백, 글자 크기,
+#   줄 간격도 PDF(레터 용지, 여백 1인치, 12pt / 16pt)에 맞춥니다.
+# - 한글 폰트는 WEB_FONT_CHARS(ASCII, 한글 음절/자모, 자주 쓰는 문장 부호)만 남긴 WOFF 서브셋을 씁니다. (fontTools가 필요합니다.)
+#   서브셋은 프로세스당 한 번만 만들고(처음 만들 때는 FONT_CACHE_DIR에 저장해 두었다가 다음 프로세스부터 파일을 읽음),
+#   편지마다 서브셋을 새로 만들지 않으므로 인쇄 화면을 여는 데 서버 CPU를 거의 쓰지 않습니다.
+#   서브셋에는 한글 음절이 모두 들어 있어 크기가 크므로, 화면에 보여 줄 HTML(embed_font=False)은 HTML 안에 넣지 않고
+#   Streamlit 정적 파일(WEB_FONT_STATIC_DIR, .streamlit/config.toml의 server.enableStaticServing)로 한 번만 내보내
+#   주소로 가리킵니다. 브라우저는 이 파일을 한 번 받아 캐시하고, 세션에는 글자만 담긴 작은 HTML이 남습니다.
+#   내려받는 HTML 파일(embed_font=True)만 다른 곳에서도 열 수 있도록 폰트를 HTML 안에 넣습니다.
+#   이 범위 밖의 글자(이모지, 한자 등)는 브라우저의 글꼴로 보여 줍니다.
+#   fontTools가 없으면 폰트 파일이 HTML_FONT_EMBED_MAX_BYTES 이하일 때만 통째로 넣고, 그보다 크면 브라우저의 한글 폰트를 씁니다.
+# reportlab과 streamlit에 의존하지 않습니다.
+import base64
+import functools
+import hashlib
+import html
+import io
+import os
+
+try:
+    from fontTools import subset as font_subset
+    from fontTools.ttLib import TTFont as FontToolsFont
+except ImportError: # fontTools가 없으면 서브셋을 만들지 않습니다.
+    font_subset = None
+
+from letter_draft import letter_blocks
+from metrics import registry as metrics
+
+# 인쇄 화면에 넣을 한글 폰트 (letter_pdf.KOREAN_FONT_PATH와 같은 파일)
+WEB_FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'NanumGothic.ttf')
+WEB_FONT_FAMILY = 'LetterNanumGothic'
+# 만들어 둔 웹 폰트 서브셋을 저장하는 폴더 (letter_pdf.FONT_CACHE_DIR과 같은 폴더)
+FONT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.font_cache')
+# 웹 폰트 서브셋에 남길 글자: ASCII, 문장 부호, 한글 자모, CJK 기호, 한글 음절, 전각 문자
+# 범위를 바꾸면 WEB_FONT_CHARS_VERSION을 올려 저장해 둔 서브셋을 다시 만듭니다.
+WEB_FONT_CHARS = ''.join(
+    chr(code_point)
+    for start, end in ((0x20, 0x7E), (0xA0, 0xFF), (0x2010, 0x206F), (0x3000, 0x303F), (0x3131, 0x318E),
+                       (0xAC00, 0xD7A3), (0xFF01, 0xFF5E))
+    for code_point in range(start, end + 1)
+)
+WEB_FONT_CHARS_VERSION = 1
+# 화면용 HTML이 가리킬 웹 폰트 파일을 내보내는 폴더와 그 주소. Streamlit은 앱 폴더의 static/을 app/static/으로 내보냅니다.
+# 주소는 상대 경로이므로 앱이 하위 경로(server.baseUrlPath)에서 실행되어도 맞는 곳을 가리킵니다.
+WEB_FONT_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+WEB_FONT_STATIC_URL = 'app/static'
+# fontTools 없이 폰트 파일을 통째로 넣을 수 있는 최대 크기
+HTML_FONT_EMBED_MAX_BYTES = 512 * 1024
+
+_PRINT_CSS = """
+@page { size: letter; margin: 1in; }
+html { background: #fff; }
+body { margin: 0; color: #000; font-family: %(font_family)s; font-size: 12pt; line-height: 16pt; }
+.letter { max-width: 6.5in; margin: 0 auto; padding: 6pt; box-sizing: border-box; }
+.letter p { margin: 0; overflow-wrap: anywhere; }
+.print-bar { max-width: 6.5in; margin: 0 auto 12pt; text-align: right; }
+.print-bar button { font: inherit; padding: 4pt 12pt; cursor: pointer; }
+@media print { .print-bar { display: none; } }
+"""
+
+def _write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path) # 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 한 번에 교체합니다.
+
+def _web_font_subset(ttf_data, digest):
+    """WEB_FONT_CHARS만 남긴 WOFF 폰트 바이트를 돌려줍니다. FONT_CACHE_DIR에 저장해 둔 서브셋이 있으면 그 파일을 읽습니다."""
+    cache_path = os.path.join(FONT_CACHE_DIR, f"{WEB_FONT_FAMILY}-{digest}-v{WEB_FONT_CHARS_VERSION}.woff")
+    try:
+        with open(cache_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    options = font_subset.Options()
+    options.layout_features = ['*'] # 한글 조합 등에 필요한 OpenType 기능은 그대로 둡니다.
+    options.name_IDs = ['*']
+    font = FontToolsFont(io.BytesIO(ttf_data))
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(text=WEB_FONT_CHARS)
+    subsetter.subset(font)
+    font.flavor = 'woff'
+    output = io.BytesIO()
+    font.save(output)
+    font_bytes = output.getvalue()
+    try:
+        _write_file(cache_path, font_bytes)
+    except OSError:
+        pass # 캐시 폴더에 쓸 수 없는 환경이면 저장하지 않고 계속 진행합니다.
+    return font_bytes
+
+@functools.lru_cache(maxsize=1)
+def _web_font():
+    """인쇄 화면에 쓸 웹 폰트를 프로세스당 한 번만 만들어 (폰트 바이트, 형식, 파일 이름)을 돌려줍니다. 쓸 폰트가 없으면 None."""
+    try:
+        with open(WEB_FONT_PATH, 'rb') as f:
+            ttf_data = f.read()
+        digest = hashlib.sha256(ttf_data).hexdigest()[:16]
+        if font_subset is not None:
+            with metrics.span("html_font_subset"):
+                font_bytes = _web_font_subset(ttf_data, digest)
+            return font_bytes, 'woff', f"{WEB_FONT_FAMILY}-{digest}-v{WEB_FONT_CHARS_VERSION}.woff"
+        if len(ttf_data) <= HTML_FONT_EMBED_MAX_BYTES:
+            return ttf_data, 'truetype', f"{WEB_FONT_FAMILY}-{digest}.ttf"
+    except Exception:
+        pass # 폰트 파일이 없거나 읽을 수 없으면 브라우저의 한글 폰트로 보여줍니다.
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _web_font_url():
+    """웹 폰트를 WEB_FONT_STATIC_DIR에 한 번만 내보내고 그 주소를 돌려줍니다. 내보낼 수 없으면 None을 돌려줍니다."""
+    web_font = _web_font()
+    if web_font is None:
+        return None
+    font_bytes, _, file_name = web_font
+    path = os.path.join(WEB_FONT_STATIC_DIR, file_name)
+    try:
+        if not os.path.exists(path):
+            _write_file(path, font_bytes)
+    except OSError:
+        return None # 앱 폴더에 쓸 수 없는 환경이면 브라우저의 한글 폰트로 보여줍니다.
+    return f"{WEB_FONT_STATIC_URL}/{file_name}"
+
+@functools.lru_cache(maxsize=2)
+def web_font_face(embed_font=True):
+    """인쇄 화면에 넣을 @font-face 규칙을 프로세스당 한 번만 만듭니다. 넣을 폰트가 없으면 빈 문자열을 돌려줍니다.
+
+    embed_font가 True이면 폰트를 data: 주소로 규칙 안에 넣고, False이면 정적 파일 주소로 가리킵니다.
+    """
+    web_font = _web_font()
+    if web_font is None:
+        return ''
+    font_bytes, font_format, _ = web_font
+    if embed_font:
+        url = f"data:font/{font_format};base64,{base64.b64encode(font_bytes).decode('ascii')}"
+    else:
+        url = _web_font_url()
+        if url is None:
+            return ''
+    return f"@font-face {{ font-family: '{WEB_FONT_FAMILY}'; src: url({url}) format('{font_format}'); }}"
+
+def render_letter_html(letter_fields, print_button=True, embed_font=True):
+    """LETTER_FIELDS 키를 가진 dict로 인쇄용 HTML 문서(문자열)를 만듭니다.
+
+    print_button이 True이면 화면 위쪽에 브라우저 인쇄 창을 여는 버튼을 넣습니다. (인쇄물에는 나오지 않습니다.)
+    embed_font가 False이면 웹 폰트를 HTML에 넣지 않고 앱의 정적 파일 주소로 가리킵니다. (앱 화면에 보여 줄 때)
+    """
+    with metrics.span("html_render"):
+        paragraphs = []
+        for bold, text, space_after in letter_blocks(**letter_fields):
+            parts = []
+            if bold:
+                parts.append(f"<b>{html.escape(bold)}</b>")
+            if text:
+                parts.append(html.escape(text))
+            style = f' style="margin-bottom: {space_after:g}pt"' if space_after else ''
+            paragraphs.append(f"<p{style}>{' '.join(parts)}</p>")
+        font_face = web_font_face(embed_font)
+        font_family = f"'{WEB_FONT_FAMILY}', " if font_face else ''
+        font_family += "'NanumGothic', 'Nanum Gothic', 'Apple SD Gothic Neo', 'Malgun Gothic', sans-serif"
+        title = html.escape(f"{letter_fields['recipient_character']}에게 보내는 편지")
+        print_bar = (
+            '<div class="print-bar"><button type="button" onclick="window.print()">인쇄 / PDF로 저장</button></div>'
+            if print_button else ''
+        )
+        document = (
+            '<!DOCTYPE html>\n<html lang="ko"><head><meta charset="utf-8">'
+            f'<title>{title}</title><style>{font_face}{_PRINT_CSS % {"font_family": font_family}}</style></head>'
+            f'<body>{print_bar}<main class="letter">{"".join(paragraphs)}</main></body></html>\n'
+        )
+    metrics.inc("html_views_total")
+    return document
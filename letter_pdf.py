@@ -0,0 +1,496 @@
+# --- 편지 PDF 생성 모듈 ---
+# Streamlit 화면(app.py)과 일괄 내보내기 작업 프로세스(batch_export.py)가 함께 사용하는 PDF 생성 코드입니다.
+# 작업 프로세스에서도 불러올 수 있도록 streamlit에 의존하지 않습니다.
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus.paragraph import split as split_words, strip as strip_words
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.fonts import tt2ps
+from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace, TTEncoding
+from reportlab import rl_config, Version as REPORTLAB_VERSION
+from fnmatch import fnmatch
+from weakref import WeakKeyDictionary
+import functools
+import hashlib
+import io
+import math
+import os
+import pickle
+import re
+import threading
+import time
+
+from letter_draft import letter_blocks
+from metrics import registry as metrics
+
+# --- PDF 출력을 위한 한글 폰트 등록 ---
+# Streamlit Cloud 환경에서 PDF에 한글을 올바르게 표시하려면,
+# 'NanumGothic.ttf'와 같은 한글 폰트 파일이 app.py(이 모듈)와 동일한 디렉토리에 있어야 합니다.
+# 폰트 파일이 없으면 PDF에서 한글이 깨지거나 표시되지 않을 수 있습니다.
+KOREAN_FONT_NAME = 'NanumGothic'
+KOREAN_FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'NanumGothic.ttf')
+# 분석(parse)이 끝난 폰트 정보를 저장해 두는 디스크 캐시 폴더. 새 작업 프로세스는 TTF 전체를 다시 분석하지 않습니다.
+FONT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.font_cache')
+# 폰트 정보 캐시는 reportlab 내부 속성(TTFontFace.__dict__)을 그대로 저장하므로 파일 이름에 reportlab 버전을 넣어,
+# 버전이 바뀌면 이전 캐시를 쓰지 않고 새로 분석합니다. 저장하는 방식(_FONT_FACE_SKIP_ATTRS, _make_ttfont 등)을 바꾸면 값을 올립니다.
+FONT_FACE_CACHE_VERSION = 1
+# 피클로 저장할 수 없거나 파일에서 다시 읽는 편이 나은 속성들
+_FONT_FACE_SKIP_ATTRS = ('_ttf_data', '_pdfScale', '_pos')
+
+def _font_face_from_cache(cache_path, ttf_data):
+    """디스크 캐시에 저장된 폰트 정보(cmap, 글자 폭, 글리프 위치 등)로 TTFontFace를 복원합니다."""
+    with open(cache_path, 'rb') as f:
+        face_state = pickle.load(f)
+    face = TTFontFace.__new__(TTFontFace)
+    face.__dict__.update(face_state)
+    face._ttf_data = ttf_data # 서브셋 생성에 원본 바이트가 필요합니다.
+    face._pos = 0
+    scale = 1000 / face.unitsPerEm
+    face._pdfScale = (lambda x: x) if face.unitsPerEm == 1000 else (lambda x: x * scale)
+    return face
+
+def _save_cache_file(cache_path, state):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path) # 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 한 번에 교체합니다.
+
+def _save_font_face_cache(cache_path, face):
+    _save_cache_file(cache_path, {k: v for k, v in face.__dict__.items() if k not in _FONT_FACE_SKIP_ATTRS})
+
+def _make_ttfont(name, face):
+    """이미 분석된 face로 TTFont 객체를 만듭니다. (TTFont.__init__은 항상 파일을 다시 분석합니다.)"""
+    font = TTFont.__new__(TTFont)
+    font.fontName = name
+    font.face = face
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    font.shapable = not any(fnmatch(name, pattern) for pattern in rl_config.unShapedFontGlob)
+    return font
+
+def _load_ttfont(name, path):
+    """TTF 파일로 TTFont를 만들어 (폰트, 읽은 곳("cache" 또는 "ttf"))을 돌려줍니다. 분석 결과는 FONT_CACHE_DIR에 저장해 둡니다."""
+    with open(path, 'rb') as f:
+        ttf_data = f.read()
+    digest = hashlib.sha256(ttf_data).hexdigest()[:16]
+    cache_path = os.path.join(FONT_CACHE_DIR, f"{name}-{digest}-rl{REPORTLAB_VERSION}-v{FONT_FACE_CACHE_VERSION}.pickle")
+    if os.path.exists(cache_path):
+        try:
+            font = _make_ttfont(name, _font_face_from_cache(cache_path, ttf_data))
+            font.stringWidth("가", 12) # 캐시가 올바른지 간단히 확인합니다.
+            return font, "cache"
+        except Exception:
+            pass # 캐시가 손상되었으면 원본 TTF를 다시 분석합니다.
+    font = TTFont(name, path)
+    try:
+        _save_font_face_cache(cache_path, font.face)
+    except OSError:
+        pass # 캐시 폴더에 쓸 수 없는 환경이면 캐시 없이 계속 진행합니다.
+    return font, "ttf"
+
+@functools.lru_cache(maxsize=None)
+def load_korean_font():
+    """한글 폰트를 프로세스당 한 번만 등록하고, 결과를 진단 정보(dict)로 돌려줍니다."""
+    started = time.perf_counter()
+    diagnostic = {"registered": False, "source": None, "load_ms": 0.0, "error": None}
+    try:
+        font, diagnostic["source"] = _load_ttfont(KOREAN_FONT_NAME, KOREAN_FONT_PATH)
+        if ord("가") not in font.face.charToGlyph:
+            # 이름만 바꾼 다른 폰트를 한글 폰트로 등록하면 경고 없이 한글이 빈 상자로 나오므로 등록하지 않습니다.
+            raise ValueError(f"{os.path.basename(KOREAN_FONT_PATH)}에 한글 글리프가 없습니다")
+        pdfmetrics.registerFont(font)
+        diagnostic["registered"] = True
+    except Exception as e:
+        diagnostic["error"] = str(e)
+    diagnostic["load_ms"] = (time.perf_counter() - started) * 1000
+    if metrics.enabled:
+        metrics.observe("font_register", diagnostic["load_ms"])
+    return diagnostic
+
+# --- 대체 폰트 ---
+# 한글 폰트에는 이모지와 여러 기호가 없어 그대로 그리면 빈 상자(tofu)로 나옵니다. 그래서 글자마다 그 글자가 있는
+# 폰트를 한글 폰트 → FALLBACK_FONTS → LAST_RESORT_FONT 순서로 골라, 같은 폰트로 그리는 조각으로 나누어 그립니다.
+# 글자를 폰트마다 찾아보지 않도록 각 폰트의 cmap으로 "코드 포인트 -> 폰트 순번" 색인을 한 번 만들어 두고 바로 찾습니다.
+# 색인은 폰트 캐시 폴더(FONT_CACHE_DIR)에 저장하므로, 새 작업 프로세스는 대체 폰트 파일을 읽지 않고 색인만 불러오며,
+# 대체 폰트는 그 폰트로 그릴 글자가 처음 나올 때 등록합니다.
+# reportlab은 컬러 이모지 폰트(NotoColorEmoji 등)를 그리지 못하므로 흑백 윤곽선 폰트를 씁니다.
+# 후보 경로 중 처음 찾은 파일을 쓰며, 상대 경로는 이 모듈이 있는 폴더를 기준으로 찾습니다.
+# 이모지 폰트는 Google Fonts의 Noto Emoji(NotoEmoji-Regular.ttf)를 이 폴더에 두는 것을 권장합니다. 감정 목록의 이모지를 모두 담고 있습니다.
+# 없으면 시스템 폰트를 찾습니다. 배포 환경에서는 packages.txt의 fonts-symbola(Symbola)를 설치하지만,
+# Symbola에는 유니코드 10 이후의 이모지(🤩, 🥳 등)가 없습니다. 그릴 폰트가 없는 글자는 missing_glyphs로 알 수 있습니다.
+FALLBACK_FONTS = (
+    ('LetterEmoji', ('NotoEmoji-Regular.ttf', 'Symbola.ttf',
+                     '/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf', '/usr/share/fonts/google-noto-emoji/NotoEmoji-Regular.ttf',
+                     '/usr/share/fonts/truetype/ancient-scripts/Symbola_hint.ttf')),
+    ('LetterSymbols', ('DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')),
+)
+# 어느 폰트에도 없는 글자를 그리는 폰트 (reportlab 기본 폰트)
+LAST_RESORT_FONT = 'Helvetica'
+# 앞 글자와 합쳐 그리는 보이지 않는 글자 (이모지를 잇는 ZWJ, 이모지/텍스트 표시 선택자). 그릴 폰트가 없으면 뺍니다.
+_JOINING_CHARS = re.compile('[\u200d\ufe0e\ufe0f]')
+
+class FontChain:
+    """대체 폰트 목록과 코드 포인트 색인. 글자마다 그릴 폰트를 고릅니다."""
+
+    def __init__(self, fonts, font_index):
+        self.fonts = fonts # [(폰트 이름, TTF 경로), ...]. 마지막은 (LAST_RESORT_FONT, None)
+        self.font_index = font_index # 코드 포인트 -> fonts 순번 (어느 TTF에도 없는 글자는 없음)
+        self.last_resort = len(fonts) - 1
+        self._registered = [name in pdfmetrics.getRegisteredFontNames() or path is None for name, path in fonts]
+        self._lock = threading.Lock()
+
+    def position(self, char):
+        return self.font_index.get(ord(char), self.last_resort)
+
+    def font_name(self, position):
+        """position번째 폰트 이름. 아직 등록하지 않은 대체 폰트이면 지금 등록합니다."""
+        if not self._registered[position]:
+            with self._lock:
+                if not self._registered[position]:
+                    name, path = self.fonts[position]
+                    try:
+                        pdfmetrics.registerFont(_load_ttfont(name, path)[0])
+                    except Exception:
+                        self.fonts[position] = (LAST_RESORT_FONT, None) # 폰트 파일이 손상되었으면 마지막 폰트로 그립니다.
+                    self._registered[position] = True
+        return self.fonts[position][0]
+
+    def visible_text(self, text):
+        """그릴 폰트가 없는 보이지 않는 글자(_JOINING_CHARS)를 뺀 글"""
+        return _JOINING_CHARS.sub(lambda m: m[0] if ord(m[0]) in self.font_index else '', text)
+
+    def missing_chars(self, text):
+        """text에서 어느 폰트에도 없어 빈 상자로 그려질 글자들 (중복 없이 나온 순서대로)"""
+        missing = []
+        for char in self.visible_text(text):
+            if self.position(char) != self.last_resort or char.isspace() or char in missing:
+                continue
+            try:
+                char.encode('cp1252') # 마지막 폰트(Helvetica)로 그릴 수 있는 글자
+            except UnicodeEncodeError:
+                missing.append(char)
+        return ''.join(missing)
+
+    def spans(self, text):
+        """visible_text(text)를 같은 폰트로 그리는 조각 [(폰트 이름, 조각), ...]으로 나눕니다."""
+        text = self.visible_text(text)
+        font_index = self.font_index.get
+        last_resort = self.last_resort
+        spans = []
+        start = 0
+        current = None
+        for i, char in enumerate(text):
+            position = font_index(ord(char), last_resort)
+            if position != current:
+                if i:
+                    spans.append((current, text[start:i]))
+                start = i
+                current = position
+        if text:
+            spans.append((current, text[start:]))
+        return [(self.font_name(position), span) for position, span in spans]
+
+def _build_font_index(fonts):
+    """각 TTF의 cmap으로 코드 포인트 -> 폰트 순번 색인을 만듭니다. 앞쪽 폰트에 있는 글자는 앞쪽 폰트로 그립니다."""
+    font_index = {}
+    for position, (name, path) in enumerate(fonts[:-1]):
+        if name in pdfmetrics.getRegisteredFontNames():
+            face = pdfmetrics.getFont(name).face
+        else:
+            face = _load_ttfont(name, path)[0].face # 색인만 만들고 등록은 필요할 때 합니다.
+        for code_point, glyph in face.charToGlyph.items():
+            if glyph: # 0번 글리프는 "글자 없음" 상자입니다.
+                font_index.setdefault(code_point, position)
+    return font_index
+
+@functools.lru_cache(maxsize=None)
+def font_chain():
+    """한글 폰트(등록된 경우) → 찾은 대체 폰트 → LAST_RESORT_FONT 순서의 FontChain을 프로세스당 한 번 만듭니다."""
+    fonts = [(KOREAN_FONT_NAME, KOREAN_FONT_PATH)] if load_korean_font()["registered"] else []
+    font_dir = os.path.dirname(os.path.abspath(__file__))
+    for name, candidates in FALLBACK_FONTS:
+        path = next((path for path in (os.path.join(font_dir, c) for c in candidates) if os.path.isfile(path)), None)
+        if path is not None:
+            fonts.append((name, path))
+    fonts.append((LAST_RESORT_FONT, None))
+    with metrics.span("font_index_load"):
+        # 폰트 파일이 바뀌면(크기, 수정 시각) 색인을 다시 만듭니다.
+        font_files = [(name, path, os.path.getsize(path), os.path.getmtime(path)) for name, path in fonts[:-1]]
+        digest = hashlib.sha256(repr(font_files).encode('utf-8')).hexdigest()[:16]
+        cache_path = os.path.join(FONT_CACHE_DIR, f"font-index-{digest}.pickle")
+        try:
+            with open(cache_path, 'rb') as f:
+                font_index = pickle.load(f)
+        except Exception: # 색인이 없거나 손상되었으면 다시 만듭니다.
+            font_index = _build_font_index(fonts)
+            try:
+                _save_cache_file(cache_path, font_index)
+            except OSError:
+                pass
+    return FontChain(fonts, font_index)
+
+def missing_glyphs(letter_fields):
+    """편지(LETTER_FIELDS 키를 가진 dict)에서 어느 폰트에도 없어 PDF에 빈 상자로 나올 글자들을 돌려줍니다."""
+    return font_chain().missing_chars(''.join(bold + text for bold, text, _ in letter_blocks(**letter_fields)))
+
+def font_markup(text, base_font_name):
+    """Paragraph 마크업에 넣을 글. base_font_name으로 그리지 않는 조각은 <font name=...>으로 감쌉니다."""
+    return "".join(
+        span if name == base_font_name else f'<font name="{name}">{span}</font>'
+        for name, span in font_chain().spans(text)
+    )
+
+# generate_pdf가 받는 편지 필드 이름. 일괄 내보내기 입력(JSON)의 키도 이 이름을 그대로 사용합니다.
+LETTER_FIELDS = (
+    "recipient_character", "event_desc", "selected_emojis", "shared_feelings_summary",
+    "intro", "event_detail", "my_thoughts", "shared_feelings_detail", "closing", "writer_name",
+    "writer_character",
+)
+
+@functools.lru_cache(maxsize=None)
+def get_korean_style():
+    """편지 본문에 사용할 문단 스타일을 프로세스당 한 번만 만듭니다. (돌려받은 스타일은 고치지 않습니다.)"""
+    styles = getSampleStyleSheet() # 기본 스타일 시트를 가져옵니다.
+
+    # 한글 폰트가 등록되었는지 확인하고, 적절한 폰트 스타일을 적용합니다.
+    korean_style = styles['Normal']
+    if load_korean_font()["registered"]:
+        korean_style.fontName = KOREAN_FONT_NAME # 등록된 나눔고딕 폰트 사용
+    else:
+        korean_style.fontName = 'Helvetica' # 폰트가 없을 경우 기본 폰트 (한글 깨짐 가능성 있음)
+    korean_style.fontSize = 12
+    korean_style.leading = 16 # 줄 간격 설정
+    return korean_style
+
+def _block_paragraph(korean_style, bold, text):
+    """letter_blocks의 문단 하나로 Paragraph를 만듭니다. 한글 폰트에 없는 글자(이모지 등)는 대체 폰트 조각으로 나눕니다."""
+    markup = f"<b>{font_markup(bold, korean_style.fontName)}</b>" if bold else ""
+    if text:
+        text = font_markup(text, korean_style.fontName)
+        markup += f" {text}" if bold else text
+    return Paragraph(markup, korean_style)
+
+def build_letter_elements(korean_style, *letter_args, **letter_kwargs):
+    """편지 한 통을 PDF 요소(flowable) 리스트로 만듭니다. 인자는 letter_blocks와 같습니다."""
+    elements = [] # PDF에 추가될 요소들의 리스트
+    for bold, text, space_after in letter_blocks(*letter_args, **letter_kwargs):
+        elements.append(_block_paragraph(korean_style, bold, text))
+        if space_after:
+            elements.append(Spacer(1, space_after))
+    return elements
+
+# --- 고정 배치 PDF (빠른 경로) ---
+# 편지 PDF는 항상 같은 구조(제목, 본문 문단 최대 5개, 이름, 참고 정보 5줄)이므로, 한 쪽에 들어가는 편지는
+# platypus(Paragraph 마크업 해석, 문서 템플릿, 프레임 배치)를 거치지 않고 캔버스에 바로 그립니다.
+# 글꼴, 여백, 공백 폭 같은 값은 프로세스당 한 번만 계산하고, 편지마다 하는 일은 줄 나눔뿐입니다.
+# 줄 나눔은 reportlab Paragraph(글꼴 하나, 왼쪽 정렬)와 같은 규칙을 따르므로 platypus 경로와 같은 위치에 같은 줄이 그려집니다.
+# 한 쪽을 넘치거나, 마크업으로 해석될 문자(<, >, &)나 줄 나눔 규칙이 다른 공백(줄 바꿈 없는 공백, 소프트 하이픈)이
+# 있거나, 굵은 글꼴이 본문과 다른 폰트(한글 폰트가 없어 Helvetica를 쓸 때)이면 platypus 경로로 만듭니다.
+# 대체 폰트로 그릴 글자(이모지 등)가 있는 문단(보통 참고 정보의 감정 줄)은 폰트가 섞인 줄 나눔 규칙이 달라,
+# 그 문단만 Paragraph로 줄을 나눠 같은 캔버스에 그립니다.
+_FIXED_LAYOUT_UNSUPPORTED = re.compile('[<>&\xa0\xad]')
+
+class _FixedLayout:
+    """한 쪽짜리 편지의 배치 값. 편지마다 같은 값이므로 프로세스당 한 번만 만듭니다."""
+
+    def __init__(self, style):
+        self.font_name = style.fontName
+        self.font_size = style.fontSize
+        self.leading = style.leading
+        # SimpleDocTemplate 기본 여백(1인치)과 프레임 안쪽 여백(6pt)
+        self.x = inch + 6
+        self.width = letter[0] - 2 * inch - 12
+        self.top = letter[1] - inch - 6
+        self.bottom = inch + 6
+        face = pdfmetrics.getFont(self.font_name).face
+        self._char_widths = face.charWidths
+        self._default_width = face.defaultWidth
+        self.space_width = self.string_width(' ')
+        self.space_shrink = style.spaceShrinkage * self.space_width # 줄 끝에서 단어 사이 공백을 줄여 한 단어를 더 넣을 수 있는 폭
+
+    def string_width(self, text):
+        """pdfmetrics.stringWidth와 같은 계산을 글자 폭 표에서 바로 합니다. (글자 수만큼 호출되므로 단계를 줄입니다.)"""
+        char_width = self._char_widths.get
+        default_width = self._default_width
+        return 0.001 * self.font_size * sum(char_width(ord(char), default_width) for char in text)
+
+    def min_height(self, words):
+        """단어들을 줄로 나눴을 때의 높이 하한. 줄 나눔 전에 한 쪽을 넘칠 편지를 빨리 걸러냅니다."""
+        if not words:
+            return 0
+        # 줄마다 담을 수 있는 폭은 줄 폭 + 공백 줄이기 폭을 넘지 않고, 줄이 나뉠 때마다 공백 하나가 빠집니다.
+        total_width = self.string_width("".join(words)) + self.space_width * len(words)
+        line_capacity = self.width + self.space_shrink * len(words) + self.space_width
+        return math.ceil(total_width / line_capacity) * self.leading
+
+    def split_long_word(self, word, line_width):
+        """한 줄보다 긴 단어를 줄 폭에 맞게 자릅니다. 첫 조각은 지금 줄의 남은 폭(line_width 이후)을 채웁니다."""
+        pieces = []
+        piece = ""
+        for char in word:
+            char_width = self.string_width(char)
+            new_width = line_width + char_width
+            if new_width > self.width and (piece or char_width <= self.width):
+                pieces.append(piece)
+                new_width = char_width
+                piece = ""
+            piece += char
+            line_width = new_width
+        pieces.append(piece)
+        return pieces
+
+    def break_lines(self, words):
+        """단어들을 줄로 나눠 (줄의 단어 목록, 남는 폭) 목록을 돌려줍니다. 공백 줄이기와 긴 단어 자르기도 Paragraph와 같습니다."""
+        pending = [(word, False) for word in words] # (단어, 긴 단어를 자른 조각인지)
+        lines = []
+        line = []
+        line_width = -self.space_width # 첫 단어 앞에는 공백이 없습니다.
+        forced_break = False
+        while pending:
+            word, is_piece = pending.pop(0)
+            if not word and is_piece:
+                forced_break = True
+            word_width = self.string_width(word)
+            new_width = line_width + self.space_width + word_width
+            limit = self.width + self.space_shrink * len(line)
+            if new_width > limit and not forced_break and not is_piece and word_width > self.width:
+                pending[0:0] = [(piece, True) for piece in self.split_long_word(word, line_width + self.space_width)]
+                forced_break = True
+                continue
+            if new_width <= limit or not line or forced_break:
+                if word:
+                    line.append(word)
+                if forced_break:
+                    forced_break = False
+                    lines.append((line, self.width - new_width))
+                    line = []
+                    line_width = -self.space_width
+                else:
+                    line_width = new_width
+            else:
+                lines.append((line, self.width - line_width))
+                line = [word]
+                line_width = word_width
+        if line:
+            lines.append((line, self.width - line_width))
+        return lines
+
+@functools.lru_cache(maxsize=None)
+def _fixed_layout():
+    style = get_korean_style()
+    if not isinstance(pdfmetrics.getFont(style.fontName), TTFont) or tt2ps(style.fontName.lower(), 1, 0) != style.fontName:
+        return None # 한글 폰트가 없거나 굵은 글씨가 다른 글꼴로 그려지면 빠른 경로를 쓰지 않습니다.
+    return _FixedLayout(style)
+
+def layout_fixed_letter(*letter_args, **letter_kwargs):
+    """편지가 한 쪽에 들어가면 그릴 줄 목록을, 아니면 None을 돌려줍니다.
+
+    각 줄은 (기준선 y, 단어 목록, 남는 폭)이고, 대체 폰트가 섞인 문단은 (문단 아래쪽 y, Paragraph, None)입니다.
+    """
+    layout = _fixed_layout()
+    if layout is None:
+        return None
+    chain = font_chain()
+    blocks = []
+    for bold, text, space_after in letter_blocks(*letter_args, **letter_kwargs):
+        if _FIXED_LAYOUT_UNSUPPORTED.search(bold) or _FIXED_LAYOUT_UNSUPPORTED.search(text):
+            return None
+        if any(chain.position(char) for char in bold) or any(chain.position(char) for char in text):
+            blocks.append((_block_paragraph(get_korean_style(), bold, text), space_after)) # 0번 폰트(한글 폰트)에 없는 글자가 있습니다.
+            continue
+        bold_words = split_words(strip_words(bold)) if strip_words(bold) else []
+        text_words = split_words(strip_words(text)) if strip_words(text) else []
+        if bold_words and text:
+            # 굵은 글씨와 보통 글씨가 섞인 문단(참고 정보의 항목 줄)은 Paragraph가 긴 단어를 자르는 방식이 달라 platypus에 맡깁니다.
+            if not text_words or any(layout.string_width(word) > layout.width for word in text_words):
+                return None
+        blocks.append((bold_words + text_words, space_after))
+    min_height = sum(layout.min_height(words) for words, _ in blocks if isinstance(words, list))
+    if min_height + sum(space_after for _, space_after in blocks) > layout.top - layout.bottom:
+        return None # 줄을 나눠 보지 않아도 한 쪽을 넘칩니다.
+
+    placed = []
+    y = layout.top
+    for words, space_after in blocks:
+        if isinstance(words, Paragraph):
+            height = words.wrap(layout.width, y - layout.bottom)[1]
+            if y - height < layout.bottom:
+                return None
+            y -= height
+            placed.append((y, words, None))
+        else:
+            lines = layout.break_lines(words)
+            if y - len(lines) * layout.leading < layout.bottom:
+                return None # 한 쪽을 넘칩니다.
+            baseline = y - layout.font_size
+            for words, extra_space in lines:
+                placed.append((baseline, words, extra_space))
+                baseline -= layout.leading
+            y -= len(lines) * layout.leading
+        if space_after and y - space_after < layout.bottom:
+            return None
+        y -= space_after
+    return placed
+
+def draw_fixed_letter(canvas, placed):
+    """layout_fixed_letter가 배치한 줄을 캔버스에 그립니다."""
+    layout = _fixed_layout()
+    text_object = canvas.beginText()
+    text_object.setFont(layout.font_name, layout.font_size, layout.leading)
+    for baseline, words, extra_space in placed:
+        if isinstance(words, Paragraph):
+            words.drawOn(canvas, layout.x, baseline) # 대체 폰트가 섞인 문단 (baseline은 문단의 아래쪽 y)
+            continue
+        text_object.setTextOrigin(layout.x, baseline)
+        if extra_space < -1e-8 and len(words) > 1:
+            # 공백을 줄여 넣은 줄은 Paragraph처럼 단어 사이 간격을 좁혀 줄 폭에 맞춥니다.
+            text_object.setWordSpace(extra_space / (len(words) - 1))
+            text_object.textOut(' '.join(words))
+            text_object.setWordSpace(0)
+        else:
+            text_object.textOut(' '.join(words))
+    canvas.drawText(text_object)
+
+# --- PDF 생성 함수 ---
+# reportlab 라이브러리를 사용하여 작성된 편지 내용을 PDF 파일로 생성합니다.
+# 한 쪽에 들어가는 편지는 고정 배치(빠른 경로)로 그리고, 그 밖의 경우에는 platypus로 문서를 빌드합니다.
+# fixed_layout=False이면 항상 platypus로 만듭니다. (성능 비교용)
+def generate_pdf(recipient_character, event_desc, selected_emojis, shared_feelings_summary,
+                 intro, event_detail, my_thoughts, shared_feelings_detail, closing, writer_name,
+                 writer_character="", fixed_layout=True):
+    buffer = io.BytesIO() # PDF 데이터를 저장할 메모리 버퍼를 생성합니다.
+    letter_args = (
+        recipient_character, event_desc, selected_emojis, shared_feelings_summary,
+        intro, event_detail, my_thoughts, shared_feelings_detail, closing, writer_name, writer_character
+    )
+    if fixed_layout:
+        with metrics.span("pdf_fixed_layout"): # 고정 배치의 줄 나눔 시간
+            placed = layout_fixed_letter(*letter_args)
+        if placed is not None:
+            with metrics.span("pdf_fixed_draw"): # 캔버스에 그리고 폰트 서브셋을 넣어 저장하는 시간
+                canvas = Canvas(buffer, pagesize=letter)
+                draw_fixed_letter(canvas, placed)
+                canvas.showPage()
+                canvas.save()
+            metrics.inc("pdf_fixed_layout_renders_total")
+            buffer.seek(0)
+            return buffer
+    doc = SimpleDocTemplate(buffer, pagesize=letter) # PDF 문서 객체를 생성합니다.
+    with metrics.span("pdf_paragraphs"): # 문단(Paragraph) 구성 시간
+        elements = build_letter_elements(get_korean_style(), *letter_args)
+    with metrics.span("pdf_doc_build"): # 줄 나눔, 페이지 배치, 폰트 서브셋을 포함한 문서 빌드 시간
+        doc.build(elements) # 정의된 요소들로 PDF 문서를 빌드합니다.
+    buffer.seek(0) # 버퍼의 읽기/쓰기 위치를 처음으로 되돌립니다.
+    return buffer # PDF 데이터가 담긴 버퍼를 반환합니다.
+
+def render_letter_pdf(letter_fields):
+    """LETTER_FIELDS 키를 가진 dict로 PDF를 만들어 바이트로 돌려줍니다. (작업 프로세스에서 호출)"""
+    pdf_bytes = generate_pdf(**letter_fields).getvalue()
+    metrics.inc("pdf_renders_total")
+    metrics.inc("pdf_bytes_total", len(pdf_bytes))
+    return pdf_bytes
@@ -0,0 +1,539 @@
+# --- 학급 부하 시험 도구 ---
+# 배포 규모를 짐작으로 정하지 않도록, 로컬에서 앱 서버를 띄우고 학생 N명이 동시에 화면 1→5를 진행하는 상황을 흉내 냅니다.
+# 가상 학생은 브라우저 대신 Streamlit의 웹소켓 프로토콜로 서버와 직접 주고받으며, 학생처럼 생각하는 시간을 두고
+# '나'와 등장인물을 고르고, 3~5단계 입력 칸에 글을 쓰고, emotion_multiselect에서 감정을 고른 뒤 PDF를 만들어 내려받습니다.
+#
+# 세션 수마다 새 서버 프로세스를 띄워 다음을 잽니다.
+# - 재실행 지연 시간: 위젯을 바꾸거나 버튼을 누른 뒤 그 실행(과 이어지는 실행)이 끝날 때까지의 시간 (p50/p95/p99)
+# - PDF 지연 시간: 'PDF 만들기'를 누른 뒤 'PDF 출력' 버튼이 나타날 때까지의 시간과, 파일을 내려받는 시간
+# - 서버 작업 프로세스(와 자식 프로세스), 부하 시험 프로세스 각각의 CPU 사용률과 RSS (/proc에서 읽으므로 리눅스에서만 기록)
+#
+# 사용 예:
+#   python load_test.py                                  # 30, 100, 500명 (생각하는 시간은 실제 수업과 비슷하게)
+#   python load_test.py --sessions 30 --think-scale 0.1  # 생각하는 시간을 1/10로 줄여 빠르게 확인
+#   python load_test.py -o load_after.json --compare load_before.json   # 10% 넘게 나빠진 항목이 있으면 종료 코드 1
+#   python load_test.py --url http://127.0.0.1:8501 --server-pid 1234   # 이미 띄운 로컬 서버에 접속
+#
+# 직접 띄운 서버는 임시 초안 저장소(LETTER_DRAFT_DB_PATH)를 쓰므로 가상 학생의 초안이 실제 초안과 섞이지 않습니다.
+# 결과 파일(JSON)의 "metrics"는 benchmark.py와 같은 형태이므로 benchmark.compare로 비교합니다.
+from collections import Counter
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmark import APP_PATH, compare
+
+DEFAULT_SESSION_COUNTS = (30, 100, 500)
+# 학생들이 차례로 접속하는 데 걸리는 시간(초). 세션 시작 시각을 이 시간 안에 고르게 나눕니다.
+RAMP_UP_SECONDS = 30
+# 동작 종류별로 생각하는 시간(초)의 범위. --think-scale을 곱해서 씁니다.
+THINK_TIME = {
+    "select": (3, 10), # 선택 상자, 감정, 라디오 버튼 고르기
+    "write": (20, 60), # 입력 칸 하나를 채우기
+    "navigate": (2, 6), # 화면을 읽고 버튼 누르기
+}
+# 5단계 편지 입력 칸 (app.py의 위젯 키)
+LETTER_AREA_KEYS = (
+    "letter_intro_area", "letter_event_detail_area", "letter_my_thoughts_actions_area",
+    "letter_shared_feelings_detail_area", "letter_closing_area",
+)
+# 실행 한 번, PDF 한 부를 기다리는 최대 시간(초)
+RERUN_TIMEOUT = 60
+PDF_TIMEOUT = 180
+# 실행이 끝난 뒤 이어지는 실행(콜백의 st.rerun 등)이 시작되는지 기다리는 시간(초)
+RERUN_SETTLE_SECONDS = 0.05
+# CPU / RSS를 읽는 간격(초)
+RESOURCE_SAMPLE_INTERVAL = 1.0
+SERVER_START_TIMEOUT = 60
+
+_SENTENCES = (
+    "아랑이가 낱말 카드를 만들어 엄마에게 한국말을 알려 주었어요.",
+    "친구들이 까만 달걀이라고 놀렸을 때 정말 속상했을 것 같아.",
+    "나도 전학 왔을 때 아무도 말을 걸어 주지 않아서 외로웠어.",
+    "용기를 내서 먼저 인사해 준 재현이가 참 고마웠어.",
+    "다음에는 내가 먼저 다가가서 함께 놀자고 말할게.",
+    "엄마가 한국말을 배우려고 애쓰는 모습이 멋졌어.",
+)
+
+def _percentiles(samples_ms):
+    if not samples_ms:
+        return None
+    samples_ms = sorted(samples_ms)
+    pick = lambda q: samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * q))]
+    return {"count": len(samples_ms), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": samples_ms[-1]}
+
+class LoadResults:
+    """세션 수 하나를 시험하는 동안 모든 가상 학생의 측정값을 모읍니다."""
+
+    def __init__(self):
+        self.reruns = {} # 동작 종류 -> 재실행 지연 시간(밀리초) 목록
+        self.pdf_ready_ms = []
+        self.pdf_download_ms = []
+        self.completed = 0
+        self.errors = [] # 도중에 멈춘 세션의 오류 메시지
+        self.app_exceptions = 0 # 화면에 표시된 앱 예외 수
+
+    def rerun(self, kind, elapsed_ms):
+        self.reruns.setdefault(kind, []).append(elapsed_ms)
+
+    def summary(self):
+        return {
+            "rerun": _percentiles([ms for samples in self.reruns.values() for ms in samples]),
+            "rerun_by_kind": {kind: _percentiles(samples) for kind, samples in sorted(self.reruns.items())},
+            "pdf_ready": _percentiles(self.pdf_ready_ms),
+            "pdf_download": _percentiles(self.pdf_download_ms),
+            "completed_sessions": self.completed,
+            "failed_sessions": len(self.errors),
+            "error_types": dict(Counter(error.split(": ", 1)[1] for error in self.errors)),
+            "errors": self.errors[:20],
+            "app_exceptions": self.app_exceptions,
+        }
+
+class _Widget:
+    __slots__ = ("element_type", "fragment_id", "label", "options")
+
+    def __init__(self, element_type, fragment_id, label, options):
+        self.element_type = element_type
+        self.fragment_id = fragment_id
+        self.label = label
+        self.options = options
+
+class SimulatedStudent:
+    """가상 학생 한 명. 웹소켓 하나로 앱 세션 하나를 열고 화면 1→5를 진행합니다."""
+
+    def __init__(self, http_url, results, rng, think_scale, pdf_share):
+        self.http_url = http_url
+        self.results = results
+        self.rng = rng
+        self.think_scale = think_scale
+        self.pdf_share = pdf_share
+        self.query = "" # 주소의 쿼리 문자열 (앱이 정한 ?draft= 값을 이어서 보냅니다.)
+        self.widgets = {} # 위젯 ID -> _Widget (지금 화면에 있는 위젯)
+        self.widget_states = {} # 위젯 ID -> WidgetState (브라우저처럼 실행을 요청할 때마다 함께 보냅니다.)
+        self.download_urls = {} # 다운로드 버튼 레이블 -> 파일 주소
+        self.auto_reruns = {} # fragment ID -> 주기적으로 다시 실행을 요청하는 작업
+        self.run_finished = asyncio.Event()
+        self.run_finished_at = 0.0
+        self.download_ready = asyncio.Event()
+
+    async def walk(self):
+        """접속해서 화면 1→5를 진행하고 PDF를 내려받은 뒤 연결을 닫습니다."""
+        ws_url = self.http_url.replace("http", "ws", 1) + "/_stcore/stream"
+        # 서버가 바쁠 때 ping 응답이 늦어 연결이 끊기지 않도록 ping은 보내지 않습니다. (브라우저도 보내지 않습니다.)
+        # 서버가 바쁘면 연결 수립도 늦어지므로, 실행 한 번과 같은 시간까지 기다립니다.
+        async with websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None, ping_interval=None, open_timeout=RERUN_TIMEOUT) as self.ws:
+            receiver = asyncio.create_task(self._receive())
+            try:
+                await self._walk_steps()
+            finally:
+                receiver.cancel()
+                for task in self.auto_reruns.values():
+                    task.cancel()
+
+    async def _walk_steps(self):
+        await self.rerun("load")
+        # 화면 1, 2: '나'와 받는 인물 고르기
+        for select_key in ("writer_select", "recipient_select"):
+            await self.think("select")
+            await self.choose(select_key)
+            await self.think("navigate")
+            await self.click("다음 화면")
+        # 화면 3: 사건 쓰기, 감정 고르기
+        await self.write("event_text_area")
+        emotions = []
+        for _ in range(self.rng.randint(1, 3)):
+            await self.think("select")
+            widget_id, widget = self.find("emotion_multiselect")
+            emotions.append(self.rng.choice([option for option in widget.options if option not in emotions]))
+            await self.set_value("select", "emotion_multiselect", emotions)
+        await self.think("navigate")
+        await self.click("다음 화면")
+        # 화면 4: 나누려는 마음 쓰기
+        await self.write("shared_feelings_text_area")
+        await self.think("navigate")
+        await self.click("다음 화면")
+        # 화면 5: 편지 쓰기 (점검 항목은 처음부터 '예'가 선택되어 있습니다.)
+        for area_key in LETTER_AREA_KEYS:
+            await self.write(area_key)
+        await self.think("select")
+        await self.set_value("write", "letter_writer_name_input", self.rng.choice(("민지가", "서준이가", "하윤 드림")))
+        if self.rng.random() < self.pdf_share:
+            await self.think("select")
+            await self.set_value("select", "export_mode_radio", "PDF 파일")
+            await self.think("navigate")
+            await self.export_pdf()
+
+    async def think(self, action):
+        low, high = THINK_TIME[action]
+        await asyncio.sleep(self.rng.uniform(low, high) * self.think_scale)
+
+    def find(self, key=None, label=None):
+        """위젯 키 또는 레이블로 지금 화면에 있는 위젯을 찾아 (위젯 ID, _Widget)을 돌려줍니다."""
+        for widget_id, widget in self.widgets.items():
+            if (key and widget_id.endswith("-" + key)) or (label and widget.label == label):
+                return widget_id, widget
+        raise LookupError(f"화면에서 위젯을 찾지 못했습니다: {key or label}")
+
+    async def choose(self, key):
+        widget_id, widget = self.find(key)
+        await self.set_value("select", key, self.rng.choice(widget.options))
+
+    async def write(self, key):
+        # 학생은 입력 칸을 한 번에 채우기도 하고, 조금 쓰고 나서 이어 쓰기도 합니다. (입력 칸을 벗어날 때 값이 전달됩니다.)
+        sentences = [self.rng.choice(_SENTENCES) for _ in range(self.rng.randint(1, 4))]
+        drafts = [sentences] if len(sentences) == 1 or self.rng.random() < 0.5 else [sentences[:1], sentences]
+        for draft_sentences in drafts:
+            await self.think("write")
+            await self.set_value("write", key, " ".join(draft_sentences))
+
+    async def set_value(self, kind, key, value):
+        widget_id, widget = self.find(key)
+        state = WidgetState(id=widget_id)
+        if isinstance(value, list):
+            state.string_array_value.data.extend(value)
+        else:
+            state.string_value = value
+        self.widget_states[widget_id] = state
+        await self.rerun(kind, widget.fragment_id)
+
+    async def click(self, label):
+        widget_id, widget = self.find(label=label)
+        await self.rerun("click", widget.fragment_id, trigger=widget_id)
+
+    async def export_pdf(self):
+        """'PDF 만들기'를 누르고 'PDF 출력' 버튼이 나타날 때까지 기다린 뒤 PDF를 내려받습니다."""
+        self.download_urls.pop("PDF 출력", None)
+        self.download_ready.clear()
+        clicked = time.perf_counter()
+        await self.click("PDF 만들기")
+        await asyncio.wait_for(self.download_ready.wait(), PDF_TIMEOUT)
+        self.results.pdf_ready_ms.append((time.perf_counter() - clicked) * 1000)
+        download_started = time.perf_counter()
+        pdf_bytes = await asyncio.to_thread(self._download, self.download_urls["PDF 출력"])
+        if not pdf_bytes.startswith(b"%PDF"):
+            raise RuntimeError("내려받은 파일이 PDF가 아닙니다.")
+        self.results.pdf_download_ms.append((time.perf_counter() - download_started) * 1000)
+
+    def _download(self, url):
+        with urllib.request.urlopen(self.http_url + url, timeout=PDF_TIMEOUT) as response:
+            return response.read()
+
+    async def rerun(self, kind, fragment_id="", trigger=None):
+        """지금 위젯 값으로 실행을 요청하고, 그 실행이 끝날 때까지 걸린 시간을 kind로 기록합니다."""
+        sent = time.perf_counter()
+        self.run_finished.clear()
+        await self._send(fragment_id, trigger)
+        deadline = sent + RERUN_TIMEOUT
+        while True:
+            await asyncio.wait_for(self.run_finished.wait(), max(deadline - time.perf_counter(), 0))
+            # 콜백이 이어서 실행을 요청했으면 새 실행이 시작되어 run_finished가 다시 지워집니다.
+            await asyncio.sleep(RERUN_SETTLE_SECONDS)
+            if self.run_finished.is_set():
+                break
+        self.results.rerun(kind, (self.run_finished_at - sent) * 1000)
+
+    async def _send(self, fragment_id="", trigger=None, auto=False):
+        message = BackMsg()
+        rerun_script = message.rerun_script
+        rerun_script.query_string = self.query
+        rerun_script.fragment_id = fragment_id
+        rerun_script.is_auto_rerun = auto
+        rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        if trigger:
+            rerun_script.widget_states.widgets.add(id=trigger, trigger_value=True)
+        await self.ws.send(message.SerializeToString())
+
+    async def _auto_rerun(self, fragment_id, interval):
+        # run_every fragment: 브라우저처럼 interval마다 그 fragment만 다시 실행을 요청합니다.
+        while True:
+            await asyncio.sleep(interval)
+            await self._send(fragment_id, auto=True)
+
+    def _stop_auto_reruns(self, fragment_ids):
+        for fragment_id in fragment_ids:
+            task = self.auto_reruns.pop(fragment_id, None)
+            if task is not None:
+                task.cancel()
+
+    async def _receive(self):
+        async for data in self.ws:
+            message = ForwardMsg()
+            message.ParseFromString(data)
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                self.run_finished.clear()
+                if not message.new_session.fragment_ids_this_run:
+                    # 앱 전체를 다시 그리면 이번 실행에서 그린 위젯만 화면에 남습니다.
+                    self.widgets = {}
+                    self._stop_auto_reruns(list(self.auto_reruns))
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                inner = getattr(element, element_type)
+                if element_type == "exception":
+                    self.results.app_exceptions += 1
+                widget_id = getattr(inner, "id", "")
+                if widget_id:
+                    options = tuple(getattr(inner, "options", ()))
+                    self.widgets[widget_id] = _Widget(element_type, message.delta.fragment_id, inner.label, options)
+                if element_type == "download_button":
+                    self.download_urls[inner.label] = inner.url
+                    if inner.label == "PDF 출력":
+                        self.download_ready.set()
+            elif kind == "page_info_changed":
+                self.query = message.page_info_changed.query_string
+            elif kind == "auto_rerun":
+                fragment_id = message.auto_rerun.fragment_id
+                if fragment_id not in self.auto_reruns:
+                    self.auto_reruns[fragment_id] = asyncio.create_task(self._auto_rerun(fragment_id, message.auto_rerun.interval))
+            elif kind == "stop_auto_rerun":
+                self._stop_auto_reruns(message.stop_auto_rerun.fragment_ids)
+            elif kind == "script_finished":
+                if message.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if message.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    # 화면에서 사라진 위젯의 값은 브라우저도 더 보내지 않습니다.
+                    self.widget_states = {widget_id: state for widget_id, state in self.widget_states.items() if widget_id in self.widgets}
+                self.run_finished_at = time.perf_counter()
+                self.run_finished.set()
+
+# --- 서버 프로세스의 CPU / RSS ---
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _read_proc_stat(pid):
+    """(프로세스 이름, 부모 PID, 누적 CPU 시간(초), RSS(바이트))를 돌려줍니다."""
+    with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as f:
+        stat = f.read()
+    name = stat[stat.index("(") + 1:stat.rindex(")")]
+    fields = stat[stat.rindex(")") + 2:].split()
+    # fields[0]은 stat 파일의 세 번째 항목(state)입니다. (proc(5) 참고)
+    return name, int(fields[1]), (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS, int(fields[21]) * _PAGE_SIZE
+
+def _process_tree(root_pid):
+    """root_pid와 그 자식(자손) 프로세스의 PID 목록"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                parents[int(entry)] = _read_proc_stat(entry)[1]
+            except (OSError, ValueError):
+                pass # 그사이에 끝난 프로세스
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(child for child, parent in parents.items() if parent == pid)
+    return tree
+
+class ResourceSampler:
+    """서버 작업 프로세스(와 자식 프로세스)와 이 프로세스의 CPU 사용률, RSS를 주기적으로 기록합니다."""
+
+    def __init__(self, server_pid):
+        self.server_pid = server_pid
+        self.workers = {} # PID -> 측정값
+        self.enabled = os.path.isdir("/proc")
+
+    def sample(self):
+        pids = ([*_process_tree(self.server_pid)] if self.server_pid else []) + [os.getpid()]
+        now = time.perf_counter()
+        for pid in pids:
+            try:
+                name, _, cpu_seconds, rss = _read_proc_stat(pid)
+            except (OSError, ValueError):
+                continue
+            worker = self.workers.get(pid)
+            if worker is None:
+                role = "load_client" if pid == os.getpid() else "server" if pid == self.server_pid else "server_child"
+                self.workers[pid] = {"role": role, "name": name, "first": (now, cpu_seconds), "last": (now, cpu_seconds), "cpu_max_percent": 0.0, "rss_max_bytes": rss, "rss_last_bytes": rss}
+                continue
+            last_time, last_cpu = worker["last"]
+            if now > last_time:
+                worker["cpu_max_percent"] = max(worker["cpu_max_percent"], (cpu_seconds - last_cpu) / (now - last_time) * 100)
+            worker["last"] = (now, cpu_seconds)
+            worker["rss_max_bytes"] = max(worker["rss_max_bytes"], rss)
+            worker["rss_last_bytes"] = rss
+
+    async def run(self):
+        while self.enabled:
+            self.sample()
+            await asyncio.sleep(RESOURCE_SAMPLE_INTERVAL)
+
+    def summary(self):
+        """작업 프로세스별 결과. CPU 사용률은 코어 하나를 100%로 봅니다."""
+        summary = []
+        for pid, worker in self.workers.items():
+            (first_time, first_cpu), (last_time, last_cpu) = worker["first"], worker["last"]
+            summary.append({
+                "pid": pid,
+                "role": worker["role"],
+                "name": worker["name"],
+                "cpu_avg_percent": (last_cpu - first_cpu) / (last_time - first_time) * 100 if last_time > first_time else 0.0,
+                "cpu_max_percent": worker["cpu_max_percent"],
+                "rss_max_bytes": worker["rss_max_bytes"],
+                "rss_last_bytes": worker["rss_last_bytes"],
+            })
+        return summary
+
+# --- 로컬 서버 ---
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port, draft_db_path, log_file):
+    """임시 초안 저장소를 쓰는 앱 서버를 띄우고, 요청을 받을 수 있을 때까지 기다립니다."""
+    command = [
+        sys.executable, "-m", "streamlit", "run", APP_PATH,
+        "--server.port", str(port), "--server.address", "127.0.0.1", "--server.headless", "true",
+        "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+    ]
+    process = subprocess.Popen(command, env={**os.environ, "LETTER_DRAFT_DB_PATH": draft_db_path}, stdout=log_file, stderr=subprocess.STDOUT)
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"앱 서버가 시작하지 못했습니다. (종료 코드 {process.returncode}, 로그: {log_file.name})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"앱 서버가 {SERVER_START_TIMEOUT}초 안에 준비되지 않았습니다. (로그: {log_file.name})")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# --- 시험 실행 ---
+async def run_load(http_url, session_count, args, server_pid):
+    """session_count명의 가상 학생을 ramp_up초에 걸쳐 접속시키고, 모두 끝나면 결과를 돌려줍니다."""
+    results = LoadResults()
+    sampler = ResourceSampler(server_pid)
+    sampler_task = asyncio.create_task(sampler.run())
+
+    async def student(index):
+        await asyncio.sleep(args.ramp_up * index / session_count)
+        rng = random.Random(f"{args.seed}-{index}")
+        try:
+            await SimulatedStudent(http_url, results, rng, args.think_scale, args.pdf_share).walk()
+        except Exception as e:
+            results.errors.append(f"{index}번 학생: {type(e).__name__}: {e}")
+        else:
+            results.completed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(student(index) for index in range(session_count)))
+    elapsed = time.perf_counter() - started
+    sampler_task.cancel()
+    if sampler.enabled:
+        sampler.sample()
+    return {"sessions": session_count, "elapsed_s": elapsed, **results.summary(), "workers": sampler.summary()}
+
+def run_with_local_server(session_count, args):
+    with tempfile.TemporaryDirectory(prefix="letter-load-") as temp_dir:
+        with open(os.path.join(temp_dir, "server.log"), "w") as log_file:
+            port = _free_port()
+            process = start_server(port, os.path.join(temp_dir, "drafts.sqlite3"), log_file)
+            try:
+                return asyncio.run(run_load(f"http://127.0.0.1:{port}", session_count, args, process.pid))
+            finally:
+                stop_server(process)
+
+def collect_metrics(results):
+    """비교하기 쉬운 평평한 항목 목록으로 바꿉니다. (benchmark.collect_metrics와 같은 형태)"""
+    metrics = {}
+    for result in results:
+        prefix = f"load.{result['sessions']}"
+        for name in ("rerun", "pdf_ready", "pdf_download"):
+            if result[name]:
+                for quantile in ("p50_ms", "p95_ms", "p99_ms"):
+                    metrics[f"{prefix}.{name}.{quantile}"] = {"value": result[name][quantile], "unit": "ms", "better": "lower"}
+        for role in ("server", "server_child"):
+            workers = [worker for worker in result["workers"] if worker["role"] == role]
+            if workers:
+                metrics[f"{prefix}.{role}.cpu_avg_percent"] = {"value": sum(w["cpu_avg_percent"] for w in workers), "unit": "%", "better": "lower"}
+                metrics[f"{prefix}.{role}.rss_max_bytes"] = {"value": sum(w["rss_max_bytes"] for w in workers), "unit": "bytes", "better": "lower"}
+        metrics[f"{prefix}.failed_sessions"] = {"value": result["failed_sessions"], "unit": "sessions", "better": "lower"}
+    return metrics
+
+def _quantiles_text(summary):
+    return " / ".join(f"{summary[q]:7.0f}" for q in ("p50_ms", "p95_ms", "p99_ms")) if summary else "      -"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="학생 여러 명이 동시에 앱을 쓰는 상황을 로컬에서 흉내 내어 지연 시간과 자원 사용량을 잽니다.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(DEFAULT_SESSION_COUNTS), help="동시 세션 수 (기본: 30 100 500)")
+    parser.add_argument("-o", "--output", default="load_output.json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="생각하는 시간에 곱할 값 (기본: 1.0, 0이면 쉬지 않음)")
+    parser.add_argument("--ramp-up", type=float, default=RAMP_UP_SECONDS, help=f"모든 세션이 접속하는 데 걸리는 시간(초) (기본: {RAMP_UP_SECONDS})")
+    parser.add_argument("--pdf-share", type=float, default=1.0, help="마지막에 PDF를 만드는 학생의 비율 (기본: 1.0)")
+    parser.add_argument("--seed", default="0", help="가상 학생의 선택과 생각하는 시간을 정하는 난수 시드")
+    parser.add_argument("--url", help="이미 띄운 로컬 서버 주소 (예: http://127.0.0.1:8501). 없으면 세션 수마다 새 서버를 띄웁니다.")
+    parser.add_argument("--server-pid", type=int, help="--url 서버의 PID. 주면 그 프로세스의 CPU / RSS도 기록합니다.")
+    parser.add_argument("--compare", metavar="BASELINE", help="이전 결과 파일과 비교합니다.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="나빠졌다고 판단할 변화율 (기본: 0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for session_count in args.sessions:
+        print(f"{session_count}명 시험 중...", file=sys.stderr)
+        if args.url:
+            results.append(asyncio.run(run_load(args.url.rstrip("/"), session_count, args, args.server_pid)))
+        else:
+            results.append(run_with_local_server(session_count, args))
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "think_scale": args.think_scale,
+            "ramp_up_s": args.ramp_up,
+            "pdf_share": args.pdf_share,
+            "seed": args.seed,
+        },
+        "results": results,
+        "metrics": collect_metrics(results),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'세션':>5s}  {'재실행 p50 / p95 / p99 (ms)':>28s}  {'PDF p50 / p95 / p99 (ms)':>28s}  완료/실패")
+    for result in results:
+        print(f"{result['sessions']:5d}  {_quantiles_text(result['rerun']):>28s}  {_quantiles_text(result['pdf_ready']):>28s}  {result['completed_sessions']}/{result['failed_sessions']}")
+        for worker in result["workers"]:
+            print(f"       {worker['role']:12s} {worker['name']:16s} pid {worker['pid']:<7d} CPU 평균 {worker['cpu_avg_percent']:6.1f}% 최대 {worker['cpu_max_percent']:6.1f}%  RSS 최대 {worker['rss_max_bytes'] / 2**20:7.1f}MB")
+        for error_type, count in result["error_types"].items():
+            print(f"       실패 {count}건: {error_type}", file=sys.stderr)
+    failed = any(result["failed_sessions"] for result in results)
+    if not args.compare:
+        return 1 if failed else 0
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(report["metrics"], baseline["metrics"], args.threshold)
+    print(f"\n{args.compare}와 비교 (기준을 {args.threshold:.0%} 넘게 벗어나면 '나빠짐'):")
+    for name, base_value, value, change, worse in rows:
+        print(f"{name:45s} {base_value:12.2f} -> {value:12.2f} {change:+8.1%}{'  나빠짐' if worse else ''}")
+    return 1 if failed or any(worse for *_, worse in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# --- 성능 계측 ---
+# 수업 중 "앱이 느려요"라는 말이 나왔을 때 어디에서 시간이 걸리는지 볼 수 있도록,
+# 주요 구간(폰트 등록, 화면별 실행, PDF 문단 구성/문서 빌드, 다운로드 전달)의 시간을 히스토그램으로 모으고
+# 재실행 횟수, 만든 PDF 바이트 수, 활동 중인 세션 수, PDF 대기열 길이를 셉니다. streamlit에 의존하지 않습니다.
+#
+# 환경 변수로 켜고 끕니다. (기본값은 꺼짐이며, 꺼져 있으면 계측 코드는 거의 아무 일도 하지 않습니다.)
+#   LETTER_METRICS_SAMPLE_RATE  구간 시간을 기록할 비율 (0 = 끔, 1 = 모두 기록, 0.1 = 10%만 기록)
+#   LETTER_METRICS_PORT         지정하면 http://127.0.0.1:<포트>/metrics 에서 Prometheus 형식으로 내보냅니다.
+#   LETTER_METRICS_FILE         지정하면 이 파일에 주기적으로 JSON 한 줄씩 기록합니다. (크기가 차면 새 파일로 교체)
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import bisect
+import json
+import logging
+import logging.handlers
+import os
+import random
+import threading
+import time
+
+# 시간 히스토그램의 구간 경계(밀리초)
+TIMING_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# 세션별 재실행 횟수 히스토그램의 구간 경계
+RERUN_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+# 마지막 재실행 후 이 시간(초) 안에 있는 세션을 활동 중으로 봅니다.
+SESSION_ACTIVE_WINDOW = 300
+# 파일로 내보낼 때의 기록 간격(초)과 파일 크기 제한
+METRICS_FILE_INTERVAL = 15.0
+METRICS_FILE_MAX_BYTES = 5 * 1024 * 1024
+METRICS_FILE_BACKUP_COUNT = 3
+
+class Histogram:
+    """구간별 관측 횟수와 합계를 모으는 히스토그램 (Prometheus의 histogram과 같은 형태)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # 마지막 칸은 가장 큰 경계보다 큰 값(+Inf)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        """같은 구간 경계를 가진 다른 히스토그램의 관측 값을 더합니다."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def snapshot(self):
+        cumulative = []
+        total = 0
+        for bucket_count in self.counts:
+            total += bucket_count
+            cumulative.append(total)
+        return {
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], cumulative)),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+class _Span:
+    """구간 하나의 시간을 재서 끝날 때 히스토그램에 기록합니다. with 문이나 end()로 끝냅니다."""
+
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.started = time.perf_counter()
+
+    def end(self):
+        self.registry.observe(self.name, (time.perf_counter() - self.started) * 1000)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end()
+
+class _NullSpan:
+    """계측이 꺼져 있거나 표본에 뽑히지 않았을 때 쓰는, 아무 일도 하지 않는 구간"""
+
+    __slots__ = ()
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class MetricsRegistry:
+    """프로세스 전체의 계측 값을 모읍니다. 여러 세션(스레드)이 함께 사용합니다."""
+
+    def __init__(self, sample_rate=0.0):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._timings = {} # 구간 이름 -> Histogram(밀리초)
+        self._counters = {} # 이름 -> 누적 값
+        self._gauges = {} # 이름 -> 지금 값 (대기열 길이 등)
+        self._session_reruns = {} # 세션 ID -> [재실행 횟수, 마지막 재실행 시각]
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def span(self, name):
+        """구간 시간을 재는 객체를 돌려줍니다. 표본에 뽑히지 않으면 아무 일도 하지 않는 객체를 돌려줍니다."""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, value_ms):
+        with self._lock:
+            histogram = self._timings.get(name)
+            if histogram is None:
+                histogram = self._timings[name] = Histogram(TIMING_BUCKETS_MS)
+            histogram.observe(value_ms)
+
+    def inc(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """지금 값(대기열 길이 등)을 기록합니다. 이전 값은 덮어씁니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def record_rerun(self, session_id):
+        """세션의 스크립트 실행 한 번을 셉니다."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            session = self._session_reruns.get(session_id)
+            if session is None:
+                self._session_reruns[session_id] = [1, now]
+            else:
+                session[0] += 1
+                session[1] = now
+            self._counters["reruns_total"] = self._counters.get("reruns_total", 0) + 1
+
+    def take_recorded(self):
+        """지금까지 모은 구간 시간과 카운터를 돌려주고 비웁니다. (작업 프로세스가 결과와 함께 서버 프로세스로 보낼 때 사용)"""
+        with self._lock:
+            recorded = {"timings_ms": self._timings, "counters": self._counters}
+            self._timings = {}
+            self._counters = {}
+        return recorded
+
+    def merge(self, recorded):
+        """다른 프로세스에서 take_recorded()로 받은 값을 이 저장소에 더합니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for name, histogram in recorded["timings_ms"].items():
+                mine = self._timings.get(name)
+                if mine is None:
+                    mine = self._timings[name] = Histogram(TIMING_BUCKETS_MS)
+                mine.merge(histogram)
+            for name, amount in recorded["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """지금까지 모은 값을 dict로 돌려줍니다. 오래전에 끝난 세션은 이때 정리합니다."""
+        active_since = time.time() - SESSION_ACTIVE_WINDOW
+        with self._lock:
+            for session_id in [s for s, (_, last_seen) in self._session_reruns.items() if last_seen < active_since]:
+                del self._session_reruns[session_id]
+            reruns_per_session = Histogram(RERUN_BUCKETS)
+            for reruns, _ in self._session_reruns.values():
+                reruns_per_session.observe(reruns)
+            return {
+                "timestamp": time.time(),
+                "sample_rate": self.sample_rate,
+                "timings_ms": {name: histogram.snapshot() for name, histogram in self._timings.items()},
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "active_sessions": len(self._session_reruns),
+                "reruns_per_session": reruns_per_session.snapshot(),
+            }
+
+    def render_prometheus(self):
+        """snapshot()을 Prometheus 텍스트 형식으로 바꿉니다."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram_lines(metric, histogram, label=""):
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'{metric}_bucket{{{label + "," if label else ""}le="{bound}"}} {count}')
+            suffix = f"{{{label}}}" if label else ""
+            lines.append(f"{metric}_sum{suffix} {histogram['sum']}")
+            lines.append(f"{metric}_count{suffix} {histogram['count']}")
+
+        lines.append("# TYPE letter_span_duration_ms histogram")
+        for name, histogram in sorted(snapshot["timings_ms"].items()):
+            histogram_lines("letter_span_duration_ms", histogram, f'span="{name}"')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE letter_{name} counter")
+            lines.append(f"letter_{name} {value}")
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE letter_{name} gauge")
+            lines.append(f"letter_{name} {value}")
+        lines.append("# TYPE letter_active_sessions gauge")
+        lines.append(f"letter_active_sessions {snapshot['active_sessions']}")
+        lines.append("# TYPE letter_reruns_per_session histogram")
+        histogram_lines("letter_reruns_per_session", snapshot["reruns_per_session"])
+        return "\n".join(lines) + "\n"
+
+def _sample_rate_from_env():
+    try:
+        return min(max(float(os.environ.get("LETTER_METRICS_SAMPLE_RATE", "0")), 0.0), 1.0)
+    except ValueError:
+        return 0.0
+
+# 프로세스 전체에서 함께 쓰는 계측 값 저장소
+registry = MetricsRegistry(_sample_rate_from_env())
+
+def start_http_exporter(port, host="127.0.0.1", metrics=registry):
+    """GET /metrics 요청에 Prometheus 형식으로 응답하는 작은 HTTP 서버를 백그라운드 스레드로 띄웁니다."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass # 수집기가 주기적으로 요청하므로 접속 기록은 남기지 않습니다.
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http-exporter", daemon=True).start()
+    return server
+
+def start_file_exporter(path, interval=METRICS_FILE_INTERVAL, metrics=registry):
+    """interval초마다 snapshot()을 JSON 한 줄로 path에 덧붙입니다. 파일이 커지면 path.1, path.2 ...로 넘깁니다."""
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=METRICS_FILE_MAX_BYTES, backupCount=METRICS_FILE_BACKUP_COUNT, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("letter_metrics")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    stop = threading.Event()
+
+    def write_loop():
+        while not stop.wait(interval):
+            logger.info(json.dumps(metrics.snapshot(), ensure_ascii=False))
+
+    threading.Thread(target=write_loop, name="metrics-file-exporter", daemon=True).start()
+    return stop
+
+def start_exporters_from_env():
+    """환경 변수에 지정된 내보내기 방식을 시작합니다. 프로세스당 한 번만 호출합니다."""
+    exporters = {}
+    if not registry.enabled:
+        return exporters
+    if os.environ.get("LETTER_METRICS_PORT"):
+        exporters["http"] = start_http_exporter(int(os.environ["LETTER_METRICS_PORT"]))
+    if os.environ.get("LETTER_METRICS_FILE"):
+        exporters["file"] = start_file_exporter(os.environ["LETTER_METRICS_FILE"])
+    return exporters
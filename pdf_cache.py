@@ -0,0 +1,80 @@
+# --- PDF 캐시 ---
+# Streamlit은 위젯이 바뀔 때마다 스크립트 전체를 다시 실행하므로, 같은 편지를 매번 새로 만들지 않도록
+# 편지 내용의 해시를 키로 하여 완성된 PDF 바이트를 프로세스 전체에서 공유하는 캐시에 보관합니다.
+# 항목 수, 바이트 수, 적중/실패/내보낸 횟수를 계측 값(게이지)으로 남깁니다. streamlit에 의존하지 않습니다.
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+from metrics import registry as metrics
+
+PDF_LAYOUT_VERSION = 2 # PDF 레이아웃이나 폰트 구성이 바뀌면 값을 올려 기존 캐시를 무효화합니다.
+PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024 # 캐시가 차지할 수 있는 최대 바이트 수 (64MB)
+
+def make_pdf_cache_key(letter_fields, font_registered):
+    """편지 필드와 폰트/레이아웃 버전으로 캐시 키(SHA-256)를 만듭니다."""
+    payload = json.dumps(
+        [PDF_LAYOUT_VERSION, font_registered, letter_fields],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class PdfCache:
+    """PDF 바이트를 보관하는 LRU 캐시. 항목 수가 아니라 전체 바이트 크기로 용량을 제한합니다."""
+
+    def __init__(self, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # 키 -> PDF 바이트 (가장 오래 사용하지 않은 항목이 앞쪽)
+        self._lock = threading.Lock() # 여러 세션(스레드)이 동시에 접근하므로 잠금을 사용합니다.
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            self._update_gauges()
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return # 캐시 전체보다 큰 PDF는 보관하지 않습니다.
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            self._entries[key] = data
+            self.total_bytes += len(data)
+            # 용량을 넘으면 가장 오래 사용하지 않은 항목부터 내보냅니다.
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+            self._update_gauges()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _update_gauges(self):
+        # 잠금을 쥔 상태에서 호출합니다.
+        metrics.set_gauge("pdf_cache_entries", len(self._entries))
+        metrics.set_gauge("pdf_cache_bytes", self.total_bytes)
+        metrics.set_gauge("pdf_cache_hits", self.hits)
+        metrics.set_gauge("pdf_cache_misses", self.misses)
+        metrics.set_gauge("pdf_cache_evictions", self.evictions)
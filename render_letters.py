@@ -0,0 +1,64 @@
+# --- 편지 PDF 일괄 렌더링 명령줄 도구 ---
+# Streamlit 화면을 거치지 않고 JSON Lines 파일(또는 표준 입력)에서 편지를 한 줄씩 읽어 PDF로 만듭니다.
+# 한 줄에 편지 하나이며, 키는 letter_pdf.LETTER_FIELDS와 같습니다.
+#
+# 사용 예:
+#   python render_letters.py letters.jsonl -o pdfs/
+#   cat letters.jsonl | python render_letters.py - -o pdfs/ --workers 8
+#   python render_letters.py letters.jsonl -o pdfs/ --start-offset 120   # 121번째 편지부터 다시 시작
+#
+# 처리 결과는 입력 순서대로 표준 출력에 한 줄씩 JSON으로 기록됩니다.
+#   {"index": 0, "status": "ok", "path": "pdfs/00000.pdf", "bytes": 23145}
+#   {"index": 1, "status": "error", "error": "recipient_character(편지를 받는 사람)가 비어 있습니다."}
+# 중간에 멈췄다면 마지막으로 기록된 index + 1을 --start-offset으로 넘겨 이어서 처리할 수 있습니다.
+import argparse
+import itertools
+import json
+import os
+import sys
+
+from batch_export import DEFAULT_MAX_WORKERS, iter_rendered_letters, render_jsonl_record
+
+def iter_jsonl_records(stream, start_offset=0):
+    """빈 줄을 건너뛰며 JSON Lines 레코드(문자열)를 하나씩 내놓습니다. 앞의 start_offset개는 읽기만 하고 버립니다."""
+    records = (line for line in stream if line.strip())
+    return itertools.islice(records, start_offset, None)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSON Lines로 된 편지들을 PDF 파일로 만듭니다.")
+    parser.add_argument("input", help="편지 JSON Lines 파일 경로 ('-'이면 표준 입력)")
+    parser.add_argument("-o", "--output-dir", required=True, help="PDF를 저장할 폴더")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--start-offset", type=int, default=0, help="이 번호(0부터 시작)의 편지부터 처리합니다.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    failed = 0
+    try:
+        records = iter_jsonl_records(stream, args.start_offset)
+        rendered = iter_rendered_letters(
+            records, max_workers=args.workers, render=render_jsonl_record, start_index=args.start_offset
+        )
+        for index, pdf_bytes in rendered:
+            if isinstance(pdf_bytes, Exception):
+                failed += 1
+                result = {"index": index, "status": "error", "error": str(pdf_bytes)}
+            else:
+                # 번호로 파일 이름을 정하므로, 다시 실행해도 같은 편지는 같은 파일을 덮어씁니다.
+                path = os.path.join(args.output_dir, f"{index:05d}.pdf")
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(pdf_bytes)
+                os.replace(tmp_path, path)
+                result = {"index": index, "status": "ok", "path": path, "bytes": len(pdf_bytes)}
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
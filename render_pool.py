@@ -0,0 +1,172 @@
+# --- PDF 작업 프로세스 풀 ---
+# 'PDF 만들기' 요청을 프로세스 전체에서 함께 쓰는 작업 프로세스들에서 처리합니다. PDF를 만드는 일은 CPU를 오래 쓰므로
+# 서버 프로세스의 스레드에서 만들면 GIL을 두고 다른 세션의 재실행과 다투게 되고, 한꺼번에 PDF를 만들면 모든 학생의 화면 이동이 느려집니다.
+# 작업 프로세스는 다른 코어에서 돌기 때문에 서버 프로세스는 재실행에만 CPU를 씁니다.
+#
+# - 작업 프로세스에는 한 번에 작업 프로세스 수만큼만 넘기고, 나머지 요청은 이 풀의 대기열에서 들어온 순서대로 기다립니다.
+# - 대기열 길이는 max_queue로 제한합니다. 가득 차면 submit이 RenderQueueFull을 내고, 화면에서는 잠시 후 다시 누르도록 안내합니다.
+# - 한 세션(학생)은 대기열에 요청을 하나만 둘 수 있습니다. 같은 세션이 다시 요청하면 기다리던 요청을 새 요청으로 바꾸므로,
+#   한 학생이 버튼을 여러 번 눌러 다른 학생들의 차례를 밀어낼 수 없습니다.
+# - 대기열 길이와 실행 중인 작업 수(게이지), 대기 시간과 렌더링 시간(구간), 거절한 요청 수를 계측 값으로 남깁니다.
+#   작업 프로세스 안에서 모은 계측 값(pdf_fixed_layout 등의 구간, pdf_bytes_total 등의 카운터)은 결과와 함께 돌려받아
+#   서버 프로세스의 계측 값에 더합니다.
+# 이미 작업 프로세스에 넘긴 요청은 취소해도 끝까지 만들어지며, 결과만 버려집니다. streamlit에 의존하지 않습니다.
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
+import multiprocessing
+import threading
+
+from metrics import registry as metrics
+
+def _render_in_worker(render, args):
+    # 작업 프로세스에서 실행됩니다. 결과와 함께 그동안 작업 프로세스에서 모은 계측 값을 돌려줍니다.
+    return render(*args), metrics.take_recorded()
+
+def process_pool(max_workers, initializer=None):
+    # Streamlit 서버처럼 스레드가 많은 프로세스를 fork하지 않도록 forkserver(없으면 spawn)로 작업 프로세스를 만듭니다.
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context(start_method), initializer=initializer
+    )
+
+class RenderQueueFull(Exception):
+    """대기열이 가득 차 새 요청을 받을 수 없을 때 발생합니다."""
+
+class _QueuedRender:
+    """대기열에서 작업 프로세스를 기다리는 요청 하나"""
+
+    __slots__ = ("session_id", "args", "future", "wait_span")
+
+    def __init__(self, session_id, args, future):
+        self.session_id = session_id
+        self.args = args
+        self.future = future # submit이 돌려준 Future. 작업 프로세스의 결과를 옮겨 담습니다.
+        self.wait_span = metrics.span("pdf_queue_wait") # 작업 프로세스로 넘길 때 끝냅니다.
+
+class RenderPool:
+    """작업 프로세스 풀과 크기가 제한된 대기열. 여러 세션(스레드)이 함께 사용합니다.
+
+    render는 작업 프로세스에서 실행할 모듈 최상위 함수이고, initializer는 작업 프로세스가 시작될 때 한 번 실행됩니다.
+    작업 프로세스는 첫 요청이 들어올 때 만듭니다.
+    """
+
+    def __init__(self, render, max_workers, max_queue, initializer=None):
+        self.render = render
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.rejected = 0
+        self._executor = None
+        self._running = 0
+        self._queue = deque() # 작업 프로세스를 기다리는 _QueuedRender (먼저 들어온 요청이 앞쪽)
+        self._queued_by_session = {} # 세션 ID -> 그 세션이 대기열에 둔 _QueuedRender
+        self._lock = threading.RLock() # Future 콜백이 잠금을 쥔 스레드에서 바로 불릴 수 있으므로 재진입 가능한 잠금을 씁니다.
+
+    def submit(self, session_id, *args):
+        """render(*args)를 대기열에 넣고 결과를 받을 Future를 돌려줍니다.
+
+        session_id가 대기열에 둔 요청이 있으면 그 요청을 취소하고 새 요청을 맨 뒤에 넣습니다.
+        대기열이 가득 차 있으면 RenderQueueFull을 냅니다.
+        """
+        future = Future()
+        with self._lock:
+            previous = self._queued_by_session.get(session_id)
+            if previous is not None:
+                previous.future.cancel() # 취소 콜백(_forget)이 대기열에서 뺍니다.
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                metrics.inc("pdf_queue_rejected_total")
+                raise RenderQueueFull()
+            job = _QueuedRender(session_id, args, future)
+            self._queue.append(job)
+            self._queued_by_session[session_id] = job
+            future.add_done_callback(functools.partial(self._forget, job))
+            self._dispatch()
+        return future
+
+    def position(self, future):
+        """future 앞에서 기다리는 요청 수. 대기열에 없으면(작업 프로세스에서 만드는 중이거나 끝났으면) None을 돌려줍니다."""
+        with self._lock:
+            for index, job in enumerate(self._queue):
+                if job.future is future:
+                    return index
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "running": self._running,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+            }
+
+    def _forget(self, job, future):
+        # 대기열에 있던 요청이 취소되면 바로 대기열에서 뺍니다. (대기열 길이가 실제로 기다리는 요청 수와 같도록)
+        if not future.cancelled():
+            return
+        with self._lock:
+            if self._queued_by_session.get(job.session_id) is job:
+                del self._queued_by_session[job.session_id]
+            try:
+                self._queue.remove(job)
+            except ValueError:
+                pass # 이미 작업 프로세스로 넘어가면서 대기열에서 빠졌습니다.
+            self._update_gauges()
+
+    def _dispatch(self):
+        # 쉬는 작업 프로세스가 있는 동안 대기열 앞쪽의 요청을 넘깁니다. (잠금을 쥔 상태에서 호출)
+        while self._queue and self._running < self.max_workers:
+            job = self._queue.popleft()
+            if self._queued_by_session.get(job.session_id) is job:
+                del self._queued_by_session[job.session_id]
+            if not job.future.set_running_or_notify_cancel():
+                continue # 그새 취소되었습니다.
+            job.wait_span.end()
+            try:
+                executor, worker_future = self._submit_to_worker(job)
+            except Exception as e:
+                # 새로 만든 풀도 쓸 수 없으면 이 요청은 실패로 끝내고(기다리는 화면이 멈추지 않도록) 다음 요청을 계속 넘깁니다.
+                self._executor = None
+                metrics.inc("pdf_pool_errors_total")
+                job.future.set_exception(e)
+                continue
+            self._running += 1
+            worker_future.add_done_callback(functools.partial(self._finished, job, executor, metrics.span("pdf_render_pool")))
+        self._update_gauges()
+
+    def _submit_to_worker(self, job):
+        # 작업 프로세스에 요청을 넘기고 (풀, 작업 프로세스의 Future)를 돌려줍니다. (잠금을 쥔 상태에서 호출)
+        if self._executor is None:
+            self._executor = process_pool(self.max_workers, self.initializer)
+        executor = self._executor
+        try:
+            return executor, executor.submit(_render_in_worker, self.render, job.args)
+        except BrokenProcessPool:
+            # 작업 프로세스가 비정상 종료된 풀이면 새 풀을 만들어 한 번만 다시 넘깁니다.
+            executor = self._executor = process_pool(self.max_workers, self.initializer)
+            return executor, executor.submit(_render_in_worker, self.render, job.args)
+
+    def _finished(self, job, executor, render_span, worker_future):
+        render_span.end()
+        error = worker_future.exception()
+        with self._lock:
+            self._running -= 1
+            if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                self._executor = None # 다음 요청 때 새 풀을 만듭니다.
+            self._dispatch()
+        if error is None:
+            result, recorded = worker_future.result()
+            metrics.merge(recorded)
+            metrics.inc("pdf_pool_renders_total")
+            job.future.set_result(result)
+        else:
+            metrics.inc("pdf_pool_errors_total")
+            job.future.set_exception(error)
+
+    def _update_gauges(self):
+        metrics.set_gauge("pdf_queue_depth", len(self._queue))
+        metrics.set_gauge("pdf_renders_running", self._running)
@@ -0,0 +1,172 @@
+# --- 학급 편지 현황판 (교사용) ---
+# 학생 앱과 같은 초안 저장소(drafts.sqlite3)를 읽어 학급 전체의 편지 작성 현황을 보여줍니다.
+# 학생 앱과 따로 실행합니다:  streamlit run teacher_dashboard.py --server.port 8502
+#
+# 집계 값은 초안 저장소가 편지를 기록할 때마다 조금씩 고쳐 두므로(draft_store.py의 class_counts),
+# 화면을 다시 그릴 때 모든 편지를 다시 읽지 않습니다. 학생이 입력한 내용은 몇 초 안에 반영됩니다.
+# 학급 편지 일괄 내보내기(batch_export.py)도 이 화면에서만 할 수 있습니다. (학생 앱에서는 할 수 없습니다.)
+import streamlit as st
+from draft_store import DraftStore, FIND_DRAFTS_LIMIT
+from letter_draft import STEP_TITLES, WRITER_OPTIONS, RECIPIENT_OPTIONS, EMOTIONS, EMOTION_LABELS, CHECK_QUESTIONS
+from datetime import datetime
+import json
+import os
+import tempfile
+
+# 현황을 새로 읽어 오는 간격(초)
+DASHBOARD_REFRESH_INTERVAL = 10
+
+@st.cache_resource
+def get_draft_store():
+    return DraftStore()
+
+def ratio_text(part, total):
+    return f"{part / total:.0%} ({part}/{total})" if total else "-"
+
+st.set_page_config(page_title="학급 편지 현황 (교사용)", layout="wide")
+st.title("학급 편지 현황 (교사용)")
+
+# 집계는 주기적으로 이 부분만 다시 실행하여 새로 읽습니다.
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVAL)
+def class_summary_fragment():
+    counts = get_draft_store().class_counts()
+    total = counts.get("drafts", {}).get("", 0)
+    st.metric("편지(초안) 수", total)
+    if not total:
+        st.info("아직 저장된 편지가 없습니다.")
+        return
+
+    col_recipient, col_writer = st.columns(2)
+    with col_recipient:
+        st.subheader("받는 인물별")
+        st.bar_chart({"편지 수": {name: counts.get("recipient", {}).get(name, 0) for name in RECIPIENT_OPTIONS}}, horizontal=True)
+    with col_writer:
+        st.subheader("쓰는 '나'별")
+        st.bar_chart({"편지 수": {name: counts.get("writer", {}).get(name, 0) for name in WRITER_OPTIONS}}, horizontal=True)
+
+    st.subheader("고른 감정")
+    emotion_counts = counts.get("emotion", {})
+    st.bar_chart({"편지 수": {EMOTION_LABELS[index]: emotion_counts.get(str(index), 0) for index in range(len(EMOTIONS))}})
+
+    col_steps, col_checks = st.columns(2)
+    with col_steps:
+        st.subheader("단계별 완료율")
+        # 단계 1~4는 다음 단계로 넘어간 편지, 단계 5는 PDF로 출력할 수 있는(내용을 모두 채우고 점검을 모두 '예'로 답한) 편지의 비율입니다.
+        step_reached = counts.get("step_reached", {})
+        for step, title in STEP_TITLES.items():
+            done = step_reached.get(str(step + 1), 0) if step < len(STEP_TITLES) else counts.get("ready", {}).get("", 0)
+            st.progress(done / total, text=f"{step}. {title} — {ratio_text(done, total)}")
+    with col_checks:
+        st.subheader("점검 항목 '아니오' 비율")
+        checks_answered = counts.get("check_answered", {})
+        checks_no = counts.get("check_no", {})
+        for name, question in CHECK_QUESTIONS.items():
+            answered = checks_answered.get(name, 0)
+            st.progress(checks_no.get(name, 0) / answered if answered else 0.0, text=f"{question} — {ratio_text(checks_no.get(name, 0), answered)}")
+
+class_summary_fragment()
+
+st.markdown("---")
+
+# 조건을 바꾸면 찾아보기 부분만 다시 실행됩니다.
+@st.fragment
+def find_drafts_fragment():
+    st.subheader("편지 찾아보기")
+    col_recipient, col_writer, col_emotion = st.columns(3)
+    recipient = col_recipient.selectbox("받는 인물", RECIPIENT_OPTIONS, index=None, placeholder="전체")
+    writer = col_writer.selectbox("쓰는 '나'", WRITER_OPTIONS, index=None, placeholder="전체")
+    emotion_index = col_emotion.selectbox("감정", range(len(EMOTIONS)), index=None, format_func=EMOTION_LABELS.__getitem__, placeholder="전체")
+    found = get_draft_store().find_drafts(recipient=recipient, writer=writer, emotion_index=emotion_index)
+    if len(found) == FIND_DRAFTS_LIMIT:
+        st.caption(f"최근에 고친 {FIND_DRAFTS_LIMIT}통만 표시합니다. 조건을 더 골라 범위를 좁혀 보세요.")
+    else:
+        st.caption(f"{len(found)}통 (최근에 고친 순서)")
+    st.dataframe(
+        [
+            {
+                "초안 ID": row["draft_id"],
+                "쓰는 '나'": row["writer_character"],
+                "받는 인물": row["selected_character"],
+                "진행 단계": row["max_step"],
+                "출력 가능": "예" if row["ready"] else "아니오",
+                "마지막 수정": datetime.fromtimestamp(row["updated_at"]).strftime("%m-%d %H:%M"),
+            }
+            for row in found
+        ],
+        hide_index=True,
+    )
+
+find_drafts_fragment()
+
+st.markdown("---")
+
+# --- 학급 편지 일괄 내보내기 ---
+# 여러 학생의 편지를 JSON Lines 파일(한 줄에 편지 하나, generate_pdf와 같은 필드 이름)로 받아
+# 하나의 PDF(편지마다 한 페이지) 또는 편지별 PDF가 담긴 ZIP으로 한꺼번에 만듭니다.
+# 내보내는 동안 이 부분만 다시 실행되므로 위의 현황은 그대로 보입니다.
+# 만든 파일은 메모리가 아니라 임시 파일에 기록하고 세션에는 경로만 보관하며, 내려받으면 지웁니다.
+# 만들지 못한 편지는 건너뛰고 "N번째 편지: 오류"로 알려 줍니다.
+def discard_batch_export():
+    """일괄 내보내기 결과(임시 파일)를 지웁니다. 파일을 내려받은 뒤(on_click)와 새로 내보내기 전에 호출합니다."""
+    result = st.session_state.pop("batch_export_result", None)
+    if result is not None:
+        try:
+            os.remove(result[1])
+        except OSError:
+            pass
+
+@st.fragment
+def batch_export_fragment():
+    st.subheader("학급 편지 일괄 내보내기")
+    batch_file = st.file_uploader("편지 목록 (.jsonl)", type=["jsonl", "json"], key="batch_letters_file")
+    batch_format = st.radio("내보내기 형식", ["합친 PDF", "ZIP"], key="batch_format_radio", horizontal=True)
+    if batch_file is not None and st.button("일괄 내보내기", key="batch_export_button"):
+        discard_batch_export()
+        # reportlab은 불러오는 데 시간이 걸리므로 일괄 내보내기를 처음 할 때 불러옵니다.
+        from letter_pdf import load_korean_font
+        from batch_export import normalize_letter, export_zip, export_merged_pdf
+        font_diagnostic = load_korean_font()
+        if not font_diagnostic["registered"]:
+            st.warning(f"PDF 출력 시 한글 폰트 로드 오류: {font_diagnostic['error']}. 'NanumGothic.ttf' 파일이 같은 폴더에 없거나 손상되었을 수 있습니다.")
+        batch_letters = []
+        batch_errors = []
+        for line_number, line in enumerate(batch_file.getvalue().decode("utf-8").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                batch_letters.append(normalize_letter(json.loads(line)))
+            except ValueError as e:
+                batch_errors.append(f"{line_number}번째 줄: {e}")
+        for error in batch_errors:
+            st.error(error)
+        if batch_letters:
+            progress_bar = st.progress(0.0, text="편지를 만드는 중...")
+            report_progress = lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total}통 완료")
+            if batch_format == "ZIP":
+                batch_file_name, batch_mime, export = "학급_편지.zip", "application/zip", export_zip
+            else:
+                batch_file_name, batch_mime, export = "학급_편지.pdf", "application/pdf", export_merged_pdf
+            fd, batch_path = tempfile.mkstemp(prefix="letters-", suffix=os.path.splitext(batch_file_name)[1])
+            try:
+                with os.fdopen(fd, "wb") as batch_output:
+                    failures = export(batch_letters, batch_output, progress=report_progress)
+            except Exception as e:
+                os.remove(batch_path)
+                st.error(f"일괄 내보내기 파일을 만들지 못했습니다: {e}")
+            else:
+                for index, error in failures:
+                    st.error(f"{index + 1}번째 편지: {error}")
+                if len(failures) < len(batch_letters):
+                    st.session_state.batch_export_result = (batch_file_name, batch_path, batch_mime)
+                else:
+                    os.remove(batch_path)
+    batch_export_result = st.session_state.get("batch_export_result")
+    if batch_export_result is not None:
+        batch_file_name, batch_path, batch_mime = batch_export_result
+        with open(batch_path, "rb") as batch_data:
+            st.download_button(
+                "일괄 내보내기 파일 받기", data=batch_data, file_name=batch_file_name, mime=batch_mime,
+                on_click=discard_batch_export,
+            )
+
+batch_export_fragment()